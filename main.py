@@ -220,6 +220,7 @@ def main():
         if args.query:
             sys.exit(1)
     
+    agent = None
     try:
         # 创建Agent / Create Agent
         logger.info("正在初始化Agent / Initializing Agent...")
@@ -240,6 +241,9 @@ def main():
         logger.error(f"程序错误 / Program error: {str(e)}")
         print(f"\n❌ 程序错误 / Program error: {str(e)}")
         sys.exit(1)
+    finally:
+        if agent is not None:
+            agent.close()
 
 
 if __name__ == "__main__":
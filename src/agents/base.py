@@ -41,6 +41,29 @@ from src.utils.helpers import format_tool_result, generate_request_id, is_search
 logger = get_logger("agents.base")
 
 
+def _content_text(content: Any) -> str:
+    """
+    将消息内容规范化为文本 / Normalize message content to text
+    
+    provider为anthropic时，带缓存断点的消息内容是文本块列表；此处拼接各块的text
+    With provider anthropic, messages carrying cache breakpoints have a list of text blocks
+    as content; their text is concatenated here
+    
+    Args:
+        content: 字符串、文本块列表或None / A string, a list of text blocks, or None
+        
+    Returns:
+        str: 文本内容 / Text content
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") for block in content if isinstance(block, dict)
+        )
+    return ""
+
+
 class BaseAgent:
     """
     基础Agent类 / Base Agent Class
@@ -298,6 +321,28 @@ You can create, modify and manage files in the workspace. For important intermed
             logger.error(f"LLM调用失败 / LLM call failed: {str(e)}")
             raise
     
+    def _log_cache_usage(self, response: Any) -> None:
+        """
+        记录提示词缓存命中情况 / Log prompt cache hits
+        
+        兼容OpenAI（prompt_tokens_details.cached_tokens）和Anthropic（cache_read_input_tokens）的用量字段
+        Supports both OpenAI (prompt_tokens_details.cached_tokens) and Anthropic (cache_read_input_tokens) usage fields
+        
+        Args:
+            response: LLM响应 / LLM response
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        
+        cached_tokens = getattr(usage, "cache_read_input_tokens", None)
+        if cached_tokens is None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", None)
+        
+        if cached_tokens is not None:
+            logger.debug(f"提示词缓存命中 / Prompt cache read tokens: {cached_tokens}, 输入 / prompt tokens: {getattr(usage, 'prompt_tokens', 'unknown')}")
+    
     def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """
         执行工具 / Execute tool with timeout protection
@@ -386,14 +431,13 @@ You can create, modify and manage files in the workspace. For important intermed
                 file_path = arguments.get("file_path") or arguments.get("path") or arguments.get("file")
                 if file_path:
                     # 优先检查内存上下文中的文件
-                    known_paths = [f.path for f in self.memory.list_files()]
-                    if file_path not in known_paths and not os.path.exists(file_path):
+                    if self.memory.get_file(file_path) is None and not os.path.exists(file_path):
                         logger.warning(f"文件工具调用使用了未知路径或不存在的文件，跳过: {file_path}")
                         results.append(ToolResult(tool_name=tool_name, status=ToolResultStatus.ERROR, output=None, error_message=f"Unknown or missing file: {file_path}"))
                         # 更新当前步骤
                         if self.steps:
-                            self.steps[-1].tool_calls.append(call_record)
-                            self.steps[-1].tool_results.append(results[-1])
+                            self.steps[-1].add_tool_call(call_record)
+                            self.steps[-1].add_tool_result(results[-1])
                         continue
 
             # 执行工具 / Execute tool
@@ -402,8 +446,8 @@ You can create, modify and manage files in the workspace. For important intermed
             
             # 更新当前步骤 / Update current step
             if self.steps:
-                self.steps[-1].tool_calls.append(call_record)
-                self.steps[-1].tool_results.append(result)
+                self.steps[-1].add_tool_call(call_record)
+                self.steps[-1].add_tool_result(result)
         
         return results
     
@@ -442,7 +486,7 @@ You can create, modify and manage files in the workspace. For important intermed
                 logger.info(f"迭代 / Iteration {self.current_step}/{self.config.agent.max_iterations}")
                 
                 # 获取对话历史 / Get conversation history
-                messages = self.memory.get_openai_messages()
+                messages = self.memory.get_openai_messages(provider=self.config.model.provider)
                 
                 # 如果开启显式上下文模式，打印当前上下文 / Print context if verbose mode enabled
                 if self.verbose_context:
@@ -469,6 +513,8 @@ You can create, modify and manage files in the workspace. For important intermed
                     self.memory.add_assistant_message("[系统] LLM 响应无效或为空。")
                     return AgentResponse(success=False, final_answer="LLM 响应无效或为空。", steps=self.steps, total_iterations=self.current_step, total_tokens_used=0, execution_time=time.time()-start_time, error_message="Invalid LLM response")
                 
+                self._log_cache_usage(response)
+                
                 choice = response.choices[0]
                 message = choice.message
                 
@@ -661,7 +707,7 @@ You can create, modify and manage files in the workspace. For important intermed
             bool: 是否成功移除 / Whether removal was successful
         """
         if tool_name in self.tools:
-            del self.tools[tool_name]
+            self.tools.pop(tool_name).close()
             logger.info(f"移除工具 / Removed tool: {tool_name}")
             
             # 更新系统提示词 / Update system prompt
@@ -683,6 +729,21 @@ You can create, modify and manage files in the workspace. For important intermed
         
         logger.info("Agent状态已重置 / Agent state reset")
     
+    def close(self) -> None:
+        """
+        关闭Agent，释放工具和记忆持有的资源 / Close the agent and release resources held by its tools and memory
+        """
+        for tool in self.tools.values():
+            try:
+                tool.close()
+            except Exception as e:
+                logger.warning(f"关闭工具失败 / Failed to close tool {tool.name}: {e}")
+        
+        # 关闭被淘汰消息的磁盘日志 / Close the evicted-message log
+        self.memory.close()
+        
+        logger.info("Agent已关闭 / Agent closed")
+    
     def get_status(self) -> Dict[str, Any]:
         """
         获取Agent状态 / Get Agent status
@@ -776,7 +837,7 @@ You can create, modify and manage files in the workspace. For important intermed
         Returns:
             List[str]: 文件路径列表 / List of file paths
         """
-        return [f.path for f in self.memory.list_files()]
+        return [f.path for f in self.memory.files_view()]
     
     def get_files_summary(self) -> str:
         """
@@ -815,7 +876,7 @@ You can create, modify and manage files in the workspace. For important intermed
         
         for i, msg in enumerate(messages, 1):
             role = msg.get("role", "unknown")
-            content = msg.get("content", "")
+            content = _content_text(msg.get("content"))
             
             role_display = {
                 "system": "⚙️  系统 / System",
@@ -845,6 +906,6 @@ You can create, modify and manage files in the workspace. For important intermed
                 print(f"🏷️  工具: {msg['name']}")
         
         # 统计信息 / Statistics
-        total_chars = sum(len(msg.get("content", "")) for msg in messages)
+        total_chars = sum(len(_content_text(msg.get("content"))) for msg in messages)
         print(f"\n📊 消息: {len(messages)} | 字符: {total_chars:,} | Token估计: ~{total_chars // 4:,}")
         print("="*80 + "\n")
@@ -2,7 +2,7 @@
 # Core模块 / Core Module
 # ==============================================================================
 
-from src.core.config import Config, get_config, load_config, reload_config
+from src.core.config import Config, add_reload_listener, get_config, load_config, reload_config
 from src.core.logger import get_logger, setup_logger, init_logging
 from src.core.memory import (
     FileContext,
@@ -27,6 +27,7 @@ __all__ = [
     "get_config",
     "load_config",
     "reload_config",
+    "add_reload_listener",
     # Logger
     "get_logger",
     "setup_logger",
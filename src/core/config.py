@@ -5,13 +5,22 @@
 # Responsible for loading and managing project configuration
 # ==============================================================================
 
+import hashlib
+import json
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Type
 
 import yaml
 from pydantic import BaseModel, Field
 
+# 尝试导入可选依赖 / Try importing optional dependencies
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class ModelConfig(BaseModel):
     """模型配置 / Model Configuration"""
@@ -20,6 +29,10 @@ class ModelConfig(BaseModel):
         default="https://api.moonshot.cn/v1",
         description="API基础URL / API Base URL"
     )
+    provider: str = Field(
+        default="openai",
+        description="模型服务提供方（openai/anthropic），决定提示词缓存标记方式 / Model provider (openai/anthropic), controls prompt cache markers"
+    )
     model_name: str = Field(
         default="moonshot-v1-128k",
         description="模型名称 / Model Name"
@@ -158,6 +171,10 @@ class MemoryConfig(BaseModel):
         description="最大记忆条数 / Maximum memory entries"
     )
     type: str = Field(default="buffer", description="记忆类型 / Memory type")
+    spill_path: str = Field(
+        default="",
+        description="被淘汰消息的磁盘日志路径（为空则不写入）/ On-disk log path for evicted messages (empty disables)"
+    )
 
 
 class Config(BaseModel):
@@ -197,6 +214,151 @@ def find_project_root() -> Path:
     return current_path
 
 
+def _get_cache_path(config_file: Path) -> Path:
+    """
+    获取配置缓存文件路径 / Get config cache file path
+    
+    缓存文件与YAML配置文件位于同一目录，例如 config.yaml -> config.cache.json
+    Cache file sits next to the YAML config, e.g. config.yaml -> config.cache.json
+    
+    Args:
+        config_file: YAML配置文件路径 / YAML config file path
+        
+    Returns:
+        Path: 缓存文件路径 / Cache file path
+    """
+    return config_file.with_suffix(".cache.json")
+
+
+def _dumps_json(data: Any) -> bytes:
+    """序列化为JSON字节 / Serialize to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _loads_json(raw: bytes) -> Any:
+    """解析JSON字节 / Parse JSON bytes"""
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
+def _read_config_data(config_file: Path) -> Dict[str, Any]:
+    """
+    读取配置数据（优先使用JSON缓存）/ Read config data (JSON cache preferred)
+    
+    YAML解析远慢于JSON解析。缓存中记录了YAML原文的SHA-256，只有哈希一致时才使用缓存，
+    因此不依赖文件修改时间（检出旧版本或时间精度粗糙时也不会读到过期配置）。
+    若配置数据经JSON往返后会改变（如整数键、日期），则不写缓存，始终解析YAML。
+    YAML parsing is much slower than JSON. The cache records the SHA-256 of the YAML source
+    and is used only when the hash matches, so it never depends on modification times
+    (restoring an older file or coarse mtimes cannot serve stale config).
+    Data that a JSON round-trip would change (e.g. integer keys, dates) is never cached,
+    so the YAML is always parsed for it.
+    
+    Args:
+        config_file: YAML配置文件路径 / YAML config file path
+        
+    Returns:
+        Dict: 配置数据 / Config data
+    """
+    cache_file = _get_cache_path(config_file)
+    raw_yaml = config_file.read_bytes()
+    source_hash = hashlib.sha256(raw_yaml).hexdigest()
+    
+    # 尝试读取缓存 / Try reading cache
+    try:
+        cached = _loads_json(cache_file.read_bytes())
+        if (
+            isinstance(cached, dict)
+            and cached.get("sha256") == source_hash
+            and isinstance(cached.get("data"), dict)
+        ):
+            return cached["data"]
+    except (OSError, ValueError):
+        # 缓存不存在或已损坏，回退到YAML / Cache missing or corrupt, fall back to YAML
+        pass
+    
+    config_data = yaml.safe_load(raw_yaml) or {}
+    
+    # 写入缓存（失败不影响加载）；往返后类型有损失的数据不缓存
+    # Write cache (failure does not affect loading); data that loses types in the round-trip is not cached
+    try:
+        encoded = _dumps_json({"sha256": source_hash, "data": config_data})
+        if _loads_json(encoded)["data"] == config_data:
+            cache_file.write_bytes(encoded)
+    except (OSError, TypeError, ValueError):
+        pass
+    
+    return config_data
+
+
+def _construct_model(model_cls: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+    """
+    跳过校验构建配置模型 / Build config model without validation
+    
+    递归地对嵌套的配置模型调用 model_construct，避免完整的校验开销
+    Recursively calls model_construct on nested config models to skip full validation
+    
+    Args:
+        model_cls: 配置模型类 / Config model class
+        data: 配置数据 / Config data
+        
+    Returns:
+        BaseModel: 配置模型实例 / Config model instance
+    """
+    values: Dict[str, Any] = {}
+    for name, field_info in model_cls.model_fields.items():
+        if name not in data:
+            continue
+        value = data[name]
+        annotation = field_info.annotation
+        if isinstance(value, dict) and isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            value = _construct_model(annotation, value)
+        values[name] = value
+    return model_cls.model_construct(**values)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """
+    读取布尔型环境变量 / Read a boolean environment variable
+    
+    "0"、"false"、"no"、"off"（不区分大小写）视为假，其他值视为真；未设置或为空时使用默认值
+    "0", "false", "no", "off" (case-insensitive) are false and anything else is true;
+    unset or empty values fall back to the default
+    
+    Args:
+        name: 环境变量名 / Environment variable name
+        default: 未设置或为空时的默认值 / Default when unset or empty
+        
+    Returns:
+        bool: 开关值 / Flag value
+    """
+    value = (os.getenv(name) or "").strip().lower()
+    if not value:
+        return default
+    return value not in ("0", "false", "no", "off")
+
+
+def _build_config(config_data: Dict[str, Any]) -> Config:
+    """
+    由配置数据构建配置对象 / Build configuration object from config data
+    
+    默认进行完整的Pydantic校验（类型转换、嵌套默认值、错误在加载时报告）。
+    设置环境变量 SAMA_VALIDATE_CONFIG=0 可跳过校验以加快启动，此时配置值按原样使用。
+    Full Pydantic validation runs by default (type coercion, nested defaults, errors reported at load).
+    Set SAMA_VALIDATE_CONFIG=0 to skip validation for faster startup; values are then used as-is.
+    
+    Args:
+        config_data: 配置数据 / Config data
+        
+    Returns:
+        Config: 配置对象 / Configuration object
+    """
+    if _env_flag("SAMA_VALIDATE_CONFIG", True):
+        return Config.model_validate(config_data)
+    return _construct_model(Config, config_data)
+
+
 def load_config(config_path: Optional[str] = None) -> Config:
     """
     加载配置文件 / Load configuration file
@@ -232,9 +394,8 @@ def load_config(config_path: Optional[str] = None) -> Config:
     
     # 读取配置文件 / Read config file
     if config_file.exists():
-        with open(config_file, "r", encoding="utf-8") as f:
-            config_data = yaml.safe_load(f) or {}
-        return Config(**config_data)
+        config_data = _read_config_data(config_file)
+        return _build_config(config_data)
     
     return Config()
 
@@ -263,6 +424,23 @@ def get_api_key_from_env() -> Optional[str]:
 # 全局配置实例 / Global configuration instance
 _config: Optional[Config] = None
 
+# 配置重载监听器 / Config reload listeners
+_reload_listeners: List[Callable[[Config], None]] = []
+
+
+def add_reload_listener(callback: Callable[[Config], None]) -> None:
+    """
+    注册配置重载监听器 / Register a config reload listener
+    
+    监听器在 reload_config 完成后以新配置为参数调用，重复注册会被忽略
+    Listeners are called with the new config after reload_config; duplicate registrations are ignored
+    
+    Args:
+        callback: 回调函数 / Callback function
+    """
+    if callback not in _reload_listeners:
+        _reload_listeners.append(callback)
+
 
 def get_config() -> Config:
     """
@@ -308,4 +486,8 @@ def reload_config(config_path: Optional[str] = None) -> Config:
         if env_api_key:
             _config.model.api_key = env_api_key
     
+    # 通知依赖配置的缓存 / Notify caches derived from config
+    for callback in _reload_listeners:
+        callback(_config)
+    
     return _config
@@ -5,14 +5,41 @@
 # Manages Agent's conversation history and context
 # ==============================================================================
 
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, List, Optional, ValuesView
 
 from src.core.config import get_config
 
+# 尝试导入可选依赖 / Try importing optional dependencies
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+# 超过该长度的消息内容会被去重共享 / Message contents longer than this are deduplicated
+_INTERN_MIN_LENGTH = 256
+
+# 提示词缓存断点标记 / Prompt cache breakpoint marker
+_CACHE_CONTROL: Dict[str, str] = {"type": "ephemeral"}
+
+# 角色显示名称 / Role display names
+_ROLE_NAMES = {
+    "user": "用户/User",
+    "assistant": "助手/Assistant",
+    "tool": "工具/Tool"
+}
+
+
+@dataclass(slots=True)
 class FileContext:
     """
     文件上下文 / File Context
@@ -23,8 +50,11 @@ class FileContext:
     path: str
     content: Optional[str] = None
     abstract: str = ""
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: float = field(default_factory=time.time)  # Unix时间戳 / Unix timestamp
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # 摘要缓存，修改path/content/abstract后需调用 mark_dirty()
+    # Summary cache, call mark_dirty() after changing path/content/abstract
+    _summary_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式 / Convert to dictionary format"""
@@ -32,17 +62,23 @@ class FileContext:
             "path": self.path,
             "content": self.content,
             "abstract": self.abstract,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
             "metadata": self.metadata
         }
     
     def get_summary(self) -> str:
         """获取文件摘要信息 / Get file summary"""
-        size_info = f"({len(self.content)} chars)" if self.content else "(no content)"
-        return f"{self.path} {size_info}: {self.abstract}"
+        if self._summary_cache is None:
+            size_info = f"({len(self.content)} chars)" if self.content else "(no content)"
+            self._summary_cache = f"{self.path} {size_info}: {self.abstract}"
+        return self._summary_cache
+    
+    def mark_dirty(self) -> None:
+        """使摘要缓存失效 / Invalidate cached summary"""
+        self._summary_cache = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """
     消息数据类 / Message Data Class
@@ -52,38 +88,99 @@ class Message:
     """
     role: str  # "user", "assistant", "system", "tool"
     content: str
-    timestamp: datetime = field(default_factory=datetime.now)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)  # Unix时间戳 / Unix timestamp
+    # 无元数据时为None，避免为每条消息分配空字典 / None when there is no metadata, avoids an empty dict per message
+    metadata: Optional[Dict[str, Any]] = None
+    # OpenAI格式缓存（消息创建后不再修改）/ Cached OpenAI format (messages are not mutated after creation)
+    _openai_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式 / Convert to dictionary format"""
         return {
             "role": self.role,
             "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
-            "metadata": self.metadata
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "metadata": self.metadata or {}
         }
     
     def to_openai_format(self) -> Dict[str, Any]:
         """
         转换为OpenAI API格式 / Convert to OpenAI API format
         
+        结果会缓存在实例上；消息创建后视为不可变，需要不同内容时应创建新消息
+        The result is cached on the instance; messages are treated as immutable once created,
+        build a new message instead of mutating one
+        
         Returns:
             Dict: OpenAI格式的消息 / Message in OpenAI format
         """
-        msg: Dict[str, Any] = {"role": self.role, "content": self.content}
+        if self._openai_cache is not None:
+            return self._openai_cache
+        
+        msg = _FORMATTERS.get(self.role, _format_basic)(self)
+        self._openai_cache = msg
+        return msg
 
-        if self.role == "tool":
-            if self.metadata.get("tool_name"):
-                msg["name"] = self.metadata["tool_name"]
-            if self.metadata.get("tool_call_id"):
-                msg["tool_call_id"] = self.metadata["tool_call_id"]
-        elif self.role == "assistant" and self.metadata.get("tool_calls"):
-            msg["tool_calls"] = self.metadata["tool_calls"]
 
-        return msg
+# ==============================================================================
+# OpenAI格式转换函数（按角色分派）/ OpenAI Format Converters (dispatched by role)
+# ==============================================================================
+
+def _format_basic(message: Message) -> Dict[str, Any]:
+    """用户/系统消息 / User/system message"""
+    return {"role": message.role, "content": message.content}
+
+
+def _format_assistant(message: Message) -> Dict[str, Any]:
+    """助手消息（可能包含工具调用）/ Assistant message (may include tool calls)"""
+    msg: Dict[str, Any] = {"role": message.role, "content": message.content}
+    if message.metadata:
+        tool_calls = message.metadata.get("tool_calls")
+        if tool_calls:
+            msg["tool_calls"] = tool_calls
+    return msg
 
 
+def _format_tool(message: Message) -> Dict[str, Any]:
+    """工具消息（包含工具名和调用ID）/ Tool message (with tool name and call ID)"""
+    msg: Dict[str, Any] = {"role": message.role, "content": message.content}
+    metadata = message.metadata
+    if metadata:
+        tool_name = metadata.get("tool_name")
+        if tool_name:
+            msg["name"] = tool_name
+        tool_call_id = metadata.get("tool_call_id")
+        if tool_call_id:
+            msg["tool_call_id"] = tool_call_id
+    return msg
+
+
+_FORMATTERS = {
+    "user": _format_basic,
+    "system": _format_basic,
+    "assistant": _format_assistant,
+    "tool": _format_tool,
+}
+
+
+def _with_cache_control(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    为消息添加提示词缓存断点 / Add prompt cache breakpoint to message
+    
+    将字符串内容转换为带 cache_control 的文本块（Anthropic格式），返回新字典，不修改原消息
+    Converts string content into a text block carrying cache_control (Anthropic format),
+    returns a new dict without mutating the original message
+    
+    Args:
+        msg: OpenAI格式的消息 / Message in OpenAI format
+        
+    Returns:
+        Dict: 带缓存断点的消息 / Message with cache breakpoint
+    """
+    marked = dict(msg)
+    marked["content"] = [{"type": "text", "text": msg["content"], "cache_control": _CACHE_CONTROL}]
+    return marked
+
 
 class ConversationMemory:
     """
@@ -93,16 +190,37 @@ class ConversationMemory:
     Manages conversation history, supports adding, retrieving and clearing messages
     """
     
-    def __init__(self, max_entries: Optional[int] = None):
+    def __init__(self, max_entries: Optional[int] = None, spill_path: Optional[str] = None):
         """
         初始化对话记忆 / Initialize conversation memory
         
         Args:
             max_entries: 最大记忆条数 / Maximum memory entries
+            spill_path: 被淘汰消息的日志路径 / Log path for evicted messages
         """
         config = get_config()
         self.max_entries = max_entries or config.memory.max_entries
-        self.messages: List[Message] = []
+        # 被淘汰的消息以JSON Lines追加写入磁盘，首次淘汰时才打开文件
+        # Evicted messages are appended to disk as JSON Lines, the file is opened on first eviction
+        self.spill_path = spill_path if spill_path is not None else config.memory.spill_path
+        self._spill_file: Optional[BinaryIO] = None
+        # 定长环形缓冲区，超出最大条数时自动淘汰最早的消息
+        # Fixed-size ring buffer, oldest messages are evicted automatically when full
+        self.messages: Deque[Message] = deque(maxlen=self.max_entries)
+        # 与messages同步的OpenAI格式消息（相同maxlen，同步淘汰）；依赖消息创建后不可变
+        # OpenAI-format messages kept in lockstep with messages (same maxlen, evicted together);
+        # relies on messages being immutable once added
+        self._openai_messages: Deque[Dict[str, Any]] = deque(maxlen=self.max_entries)
+        # 对话消息内容的字符总数（不含系统消息）/ Total content chars of messages (excluding system)
+        self._content_chars = 0
+        # 历史中各工具消息数量（随添加/淘汰增量维护）/ Tool message counts in history (maintained on add/evict)
+        self._tool_counts: Counter = Counter()
+        # 最新的工具消息 / Latest tool message
+        self._latest_tool_message: Optional[Message] = None
+        # 长内容驻留表（以内容本身为键，str会缓存哈希值）及引用计数
+        # Interning table for long contents (keyed by the content itself, str caches its hash) and ref counts
+        self._content_intern: Dict[str, str] = {}
+        self._content_refs: Dict[str, int] = {}
         self.system_message: Optional[Message] = None
         self.files: Dict[str, FileContext] = {}  # 文件上下文字典，key为文件路径 / File context dict, key is file path
     
@@ -148,7 +266,12 @@ class ConversationMemory:
             metadata: 元数据 / Metadata
         """
         meta = metadata or {}
-        meta["tool_name"] = tool_name
+        # 驻留工具名和调用ID，后续字典查找与比较可走指针相等的快速路径
+        # Intern tool name and call ID so later dict lookups and comparisons hit the identity fast path
+        meta["tool_name"] = sys.intern(tool_name)
+        tool_call_id = meta.get("tool_call_id")
+        if isinstance(tool_call_id, str):
+            meta["tool_call_id"] = sys.intern(tool_call_id)
         self._add_message("tool", content, meta)
     
     def _add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
@@ -160,30 +283,131 @@ class ConversationMemory:
             content: 内容 / Content
             metadata: 元数据 / Metadata
         """
-        message = Message(
-            role=role,
-            content=content,
-            metadata=metadata or {}
-        )
+        if len(content) > _INTERN_MIN_LENGTH:
+            content = self._intern_content(content)
+        message = Message(role=role, content=content, metadata=metadata or None)
+        
+        # deque达到maxlen时会自动删除最早的消息（系统消息单独保存）
+        # deque drops the oldest message once maxlen is reached (system message is kept separately)
+        evicted = self.messages[0] if len(self.messages) == self.messages.maxlen else None
         self.messages.append(message)
+        self._openai_messages.append(message.to_openai_format())
+        self._content_chars += len(content)
+        if role == "tool":
+            self._tool_counts[message.metadata.get("tool_name", "unknown")] += 1
+            self._latest_tool_message = message
+        
+        if evicted is not None:
+            # 若最新工具消息被淘汰，则剩余历史中已无工具消息
+            # If the latest tool message is evicted, no tool message remains in history
+            if evicted is self._latest_tool_message:
+                self._latest_tool_message = None
+            self._spill_message(evicted)
+            self._content_chars -= len(evicted.content)
+            if len(evicted.content) > _INTERN_MIN_LENGTH:
+                self._release_content(evicted.content)
+            if evicted.role == "tool":
+                evicted_name = evicted.metadata.get("tool_name", "unknown")
+                self._tool_counts[evicted_name] -= 1
+                if self._tool_counts[evicted_name] <= 0:
+                    del self._tool_counts[evicted_name]
+    
+    def _intern_content(self, content: str) -> str:
+        """
+        驻留长内容，相同内容共享同一字符串对象 / Intern long content so identical contents share one string
         
-        # 如果超过最大条数，删除最早的消息（保留系统消息）
-        # If exceeds max entries, remove oldest messages (keep system message)
-        while len(self.messages) > self.max_entries:
-            self.messages.pop(0)
+        Args:
+            content: 消息内容 / Message content
+            
+        Returns:
+            str: 规范字符串 / Canonical string
+        """
+        canonical = self._content_intern.setdefault(content, content)
+        self._content_refs[canonical] = self._content_refs.get(canonical, 0) + 1
+        return canonical
+    
+    def _release_content(self, content: str) -> None:
+        """
+        释放驻留内容的一次引用，引用归零时移除 / Release one reference, remove when count reaches zero
+        
+        Args:
+            content: 消息内容 / Message content
+        """
+        refs = self._content_refs.get(content, 0) - 1
+        if refs > 0:
+            self._content_refs[content] = refs
+        else:
+            self._content_refs.pop(content, None)
+            self._content_intern.pop(content, None)
+    
+    def _spill_message(self, message: Message) -> None:
+        """
+        将淘汰的消息写入磁盘日志 / Write evicted message to on-disk log
+        
+        Args:
+            message: 被淘汰的消息 / Evicted message
+        """
+        if not self.spill_path:
+            return
+        
+        try:
+            if self._spill_file is None:
+                Path(self.spill_path).parent.mkdir(parents=True, exist_ok=True)
+                self._spill_file = open(self.spill_path, "ab")
+            data = message.to_dict()
+            if ORJSON_AVAILABLE:
+                line = orjson.dumps(data)
+            else:
+                line = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self._spill_file.write(line + b"\n")
+            # 每次淘汰后立即刷新到操作系统，进程崩溃或被终止时日志不丢失
+            # Flush to the OS after every eviction so the log survives a crash or kill
+            self._spill_file.flush()
+        except (OSError, TypeError, ValueError):
+            # 日志仅用于调试回放，失败不影响对话 / Log is for debug replay only, failures do not affect conversation
+            pass
+    
+    def replay_from_log(self, n: int = 10) -> List[Dict[str, Any]]:
+        """
+        从磁盘日志读取最近被淘汰的消息 / Read recently evicted messages from on-disk log
+        
+        Args:
+            n: 读取条数 / Number of entries to read
+            
+        Returns:
+            List[Dict]: 消息字典列表（按时间顺序）/ List of message dicts (chronological)
+        """
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return []
+        
+        with open(self.spill_path, "rb") as f:
+            lines = deque(f, maxlen=n)
+        
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        return [loads(line) for line in lines]
+    
+    def close(self) -> None:
+        """关闭磁盘日志（Agent关闭时调用）/ Close on-disk log (called when the agent closes)"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
     
     def get_messages(self) -> List[Message]:
         """
         获取所有消息（包括系统消息）/ Get all messages (including system message)
         
+        返回的消息只读：OpenAI格式和上下文长度在添加时已计算，修改消息不会反映到其中
+        The returned messages are read-only: their OpenAI format and the context length are
+        computed when they are added, so mutating a message is not reflected there
+        
         Returns:
             List[Message]: 消息列表 / List of messages
         """
         if self.system_message:
-            return [self.system_message] + self.messages
-        return self.messages
+            return [self.system_message, *self.messages]
+        return list(self.messages)
     
-    def get_openai_messages(self) -> List[Dict[str, str]]:
+    def get_openai_messages(self, provider: str = "openai", cache_tail: int = 4) -> List[Dict[str, Any]]:
         """
         获取OpenAI格式的消息列表（包含文件上下文）/ Get messages in OpenAI format (including file context)
         
@@ -192,14 +416,26 @@ class ConversationMemory:
         2. 文件内容消息（如果有）/ File content messages (if any)
         3. 对话历史 / Conversation history
         
+        历史只追加不修改，OpenAI等服务可自动命中前缀缓存；provider为"anthropic"时，
+        在系统消息和最近cache_tail条之前的最后一条用户/助手消息上添加 cache_control 断点。
+        History is append-only, so OpenAI-style providers hit their prefix cache automatically;
+        with provider "anthropic", cache_control breakpoints are added to the system message and
+        to the last user/assistant message before the most recent cache_tail messages.
+        
+        Args:
+            provider: 模型服务提供方（openai/anthropic）/ Model provider (openai/anthropic)
+            cache_tail: 视为不稳定的最近消息数 / Number of recent messages treated as unstable
+        
         Returns:
             List[Dict]: OpenAI格式的消息列表 / List of messages in OpenAI format
         """
-        messages = []
+        messages: List[Dict[str, Any]] = []
+        use_cache_control = provider == "anthropic"
         
         # 1. 添加系统消息 / Add system message
         if self.system_message:
-            messages.append(self.system_message.to_openai_format())
+            system_msg = self.system_message.to_openai_format()
+            messages.append(_with_cache_control(system_msg) if use_cache_control else system_msg)
         
         # 2. 添加文件内容作为独立消息 / Add file contents as separate messages
         if self.files:
@@ -207,9 +443,17 @@ class ConversationMemory:
             if file_context_msg:
                 messages.append(file_context_msg)
         
-        # 3. 添加对话历史 / Add conversation history
-        for msg in self.messages:
-            messages.append(msg.to_openai_format())
+        # 3. 添加对话历史（已预先渲染）/ Add conversation history (pre-rendered)
+        history_start = len(messages)
+        messages.extend(self._openai_messages)
+        
+        # 在稳定历史的末尾设置缓存断点 / Set cache breakpoint at the end of stable history
+        if use_cache_control:
+            for i in range(len(messages) - cache_tail - 1, history_start - 1, -1):
+                msg = messages[i]
+                if msg["role"] in ("user", "assistant") and isinstance(msg["content"], str) and msg["content"]:
+                    messages[i] = _with_cache_control(msg)
+                    break
         
         return messages
     
@@ -252,8 +496,15 @@ class ConversationMemory:
         Returns:
             List[Message]: 消息列表 / List of messages
         """
-        messages = self.get_messages()
-        return messages[-n:] if len(messages) > n else messages
+        if n <= 0:
+            return []
+        
+        # 仅从尾部取n条，避免复制完整历史 / Only take n from the tail, avoid copying full history
+        recent = list(islice(reversed(self.messages), n))
+        recent.reverse()
+        if len(recent) < n and self.system_message:
+            recent.insert(0, self.system_message)
+        return recent
     
     def clear(self, keep_system: bool = True) -> None:
         """
@@ -262,9 +513,27 @@ class ConversationMemory:
         Args:
             keep_system: 是否保留系统消息 / Whether to keep system message
         """
-        self.messages = []
+        self.messages.clear()
+        self._openai_messages.clear()
+        self._content_chars = 0
+        self._tool_counts.clear()
+        self._latest_tool_message = None
+        self._content_intern.clear()
+        self._content_refs.clear()
         if not keep_system:
             self.system_message = None
+            self._rotate_log()
+    
+    def _rotate_log(self) -> None:
+        """
+        轮转磁盘日志（旧日志重命名为 .1）/ Rotate on-disk log (old log renamed to .1)
+        """
+        self.close()
+        if self.spill_path and os.path.exists(self.spill_path):
+            try:
+                os.replace(self.spill_path, f"{self.spill_path}.1")
+            except OSError:
+                pass
     
     def get_context_length(self) -> int:
         """
@@ -273,10 +542,9 @@ class ConversationMemory:
         Returns:
             int: 字符数 / Character count
         """
-        total = 0
-        for msg in self.get_messages():
-            total += len(msg.content)
-        return total
+        if self.system_message:
+            return self._content_chars + len(self.system_message.content)
+        return self._content_chars
     
     def summarize(self) -> str:
         """
@@ -288,16 +556,12 @@ class ConversationMemory:
         if not self.messages:
             return "无对话历史 / No conversation history"
         
-        summary_parts = []
-        for msg in self.messages[-5:]:  # 最近5条消息 / Last 5 messages
-            role_name = {
-                "user": "用户/User",
-                "assistant": "助手/Assistant",
-                "tool": "工具/Tool"
-            }.get(msg.role, msg.role)
-            summary_parts.append(f"[{role_name}]: {msg.content[:100]}...")
-        
-        return "\n".join(summary_parts)
+        # 最近5条消息 / Last 5 messages
+        recent = islice(self.messages, max(len(self.messages) - 5, 0), None)
+        return "\n".join(
+            f"[{_ROLE_NAMES.get(msg.role, msg.role)}]: {msg.content[:100]}..."
+            for msg in recent
+        )
     
     # ==============================================================================
     # 文件上下文管理方法 / File Context Management Methods
@@ -361,7 +625,8 @@ class ConversationMemory:
         if metadata is not None:
             file_ctx.metadata.update(metadata)
         
-        file_ctx.timestamp = datetime.now()
+        file_ctx.timestamp = time.time()
+        file_ctx.mark_dirty()
         return file_ctx
     
     def remove_file(self, path: str) -> bool:
@@ -374,10 +639,7 @@ class ConversationMemory:
         Returns:
             bool: 是否成功移除 / Whether removal was successful
         """
-        if path in self.files:
-            del self.files[path]
-            return True
-        return False
+        return self.files.pop(path, None) is not None
     
     def get_file(self, path: str) -> Optional[FileContext]:
         """
@@ -400,6 +662,19 @@ class ConversationMemory:
         """
         return list(self.files.values())
     
+    def files_view(self) -> ValuesView[FileContext]:
+        """
+        获取文件上下文的实时只读视图（不复制）/ Get a live read-only view of file contexts (no copy)
+        
+        视图随文件的添加和移除而变化，遍历期间不得增删文件；需要快照时请使用 list_files()
+        The view tracks files as they are added and removed, so files must not be added or removed
+        while iterating it; use list_files() for a snapshot
+        
+        Returns:
+            ValuesView[FileContext]: 按添加顺序的文件上下文视图 / View of file contexts in insertion order
+        """
+        return self.files.values()
+    
     def get_files_summary(self) -> str:
         """
         获取文件上下文摘要 / Get files summary
@@ -410,11 +685,8 @@ class ConversationMemory:
         if not self.files:
             return "当前无文件 / No files currently"
         
-        summary_lines = [f"当前文件数量 / Current files: {len(self.files)}"]
-        for file_ctx in self.files.values():
-            summary_lines.append(f"  - {file_ctx.get_summary()}")
-        
-        return "\n".join(summary_lines)
+        header = f"当前文件数量 / Current files: {len(self.files)}"
+        return "\n  - ".join([header, *(file_ctx.get_summary() for file_ctx in self.files.values())])
     
     def clear_files(self) -> None:
         """清空所有文件上下文 / Clear all file contexts"""
@@ -440,24 +712,21 @@ class ConversationMemory:
         summary_lines = []
         
         # 1. 工具使用统计 / Tool usage statistics
-        tool_counts = {}
-        for msg in self.messages[-last_n:]:
-            if msg.role == "tool":
-                tool_name = msg.metadata.get("tool_name", "unknown")
-                tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
+        if last_n >= len(self.messages):
+            # 窗口覆盖全部历史，直接使用增量计数 / Window covers full history, use incremental counts
+            tool_counts = self._tool_counts
+        else:
+            recent = islice(self.messages, len(self.messages) - last_n, None)
+            tool_counts = Counter(
+                msg.metadata.get("tool_name", "unknown") for msg in recent if msg.role == "tool"
+            )
         
         if tool_counts:
             summary_lines.append("📊 已使用工具统计 / Tools used:")
-            for tool, count in sorted(tool_counts.items(), key=lambda x: x[1], reverse=True):
-                summary_lines.append(f"   • {tool}: {count}次")
+            summary_lines.extend(f"   • {tool}: {count}次" for tool, count in tool_counts.most_common())
         
         # 2. 最新工具结果 / Latest tool results
-        latest_tool_msg = None
-        for msg in reversed(self.messages):
-            if msg.role == "tool":
-                latest_tool_msg = msg
-                break
-        
+        latest_tool_msg = self._latest_tool_message
         if latest_tool_msg:
             tool_name = latest_tool_msg.metadata.get("tool_name", "unknown")
             preview = latest_tool_msg.content[:150]
@@ -481,13 +750,15 @@ def get_memory() -> ConversationMemory:
     """
     获取全局记忆实例 / Get global memory instance
     
+    已初始化时直接返回实例，仅首次调用走创建路径
+    Returns the instance directly once initialized, only the first call takes the creation path
+    
     Returns:
         ConversationMemory: 记忆实例 / Memory instance
     """
-    global _memory
-    if _memory is None:
-        _memory = ConversationMemory()
-    return _memory
+    if _memory is not None:
+        return _memory
+    return reset_memory()
 
 
 def reset_memory() -> ConversationMemory:
@@ -9,9 +9,9 @@
 # - https://www.claude.com/blog/best-practices-for-prompt-engineering
 # ==============================================================================
 
-from typing import Dict, List, Optional
-
-from src.core.config import get_config
+import string
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 # ==============================================================================
@@ -201,15 +201,205 @@ User asked a math calculation question.
 # 工具描述模板 / Tool Description Templates
 # ==============================================================================
 
-TOOL_DESCRIPTION_TEMPLATE_ZH = """### {name}
-**描述**: {description}
-**参数**: {parameters}
-"""
+# 工具描述按 "### {name}\n**描述**: {description}\n**参数**: {parameters}\n" 的格式逐段写入缓冲区
+# Tool descriptions are written piecewise into a buffer in the layout
+# "### {name}\n**Description**: {description}\n**Parameters**: {parameters}\n"
 
-TOOL_DESCRIPTION_TEMPLATE_EN = """### {name}
-**Description**: {description}
-**Parameters**: {parameters}
-"""
+TOOL_DESCRIPTION_LABELS_ZH = ("\n**描述**: ", "\n**参数**: ")
+
+TOOL_DESCRIPTION_LABELS_EN = ("\n**Description**: ", "\n**Parameters**: ")
+
+
+# 无参数时的占位文本 / Placeholder text when a tool has no parameters
+NO_PARAMETERS_ZH = "无 / None"
+
+NO_PARAMETERS_EN = "None"
+
+
+# 英文路径拼出的提示词必须保持纯ASCII：混入任何中文字符（含全角标点）都会让拼接结果
+# 整体升级为每字符2字节的存储，内存翻倍且拼接变慢。英文模板、标签和占位文本不得含中文，
+# 参数说明只取"中文 / English"中的英文部分。该约束由 tests/test_prompts.py 检查
+# The prompt assembled on the English path must stay pure ASCII: any CJK character (including
+# full-width punctuation) widens the whole concatenated result to 2 bytes per char, doubling
+# memory and slowing joins. English templates, labels and placeholders must not contain Chinese,
+# and parameter descriptions keep only the English half of "中文 / English". Checked by
+# tests/test_prompts.py
+
+
+# 模板片段：(字面文本, 占位符名或None) / Template segment: (literal text, placeholder name or None)
+TemplateSegments = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def _compile_template(template: str) -> TemplateSegments:
+    """
+    预解析提示词模板 / Pre-parse a prompt template
+    
+    在导入时用 string.Formatter 解析一次，渲染时只需按片段拼接
+    Parsed once with string.Formatter at import, rendering only concatenates segments
+    
+    Args:
+        template: 含 {name} 占位符的模板 / Template with {name} placeholders
+        
+    Returns:
+        TemplateSegments: 解析后的片段 / Parsed segments
+        
+    Raises:
+        ValueError: 占位符带有格式说明或转换符 / Placeholder carries a format spec or conversion
+    """
+    segments = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if format_spec or conversion:
+            raise ValueError(f"不支持的占位符格式 / Unsupported placeholder format: {field_name}")
+        segments.append((literal, field_name))
+    return tuple(segments)
+
+
+def _render_template(segments: TemplateSegments, values: Dict[str, str]) -> str:
+    """
+    用参数渲染预解析的模板 / Render a pre-parsed template with values
+    
+    Args:
+        segments: 预解析的模板片段 / Pre-parsed template segments
+        values: 占位符取值 / Placeholder values
+        
+    Returns:
+        str: 渲染结果 / Rendered text
+    """
+    buf: List[str] = []
+    for literal, field_name in segments:
+        buf.append(literal)
+        if field_name is not None:
+            buf.append(values[field_name])
+    return "".join(buf)
+
+
+# 按语言索引的预解析模板，未知语言回退到英文 / Pre-parsed templates indexed by language, unknown languages fall back to English
+_SYSTEM_TEMPLATES: Dict[str, TemplateSegments] = {
+    "zh": _compile_template(SYSTEM_PROMPT_ZH),
+    "en": _compile_template(SYSTEM_PROMPT_EN),
+}
+
+
+# 配置中的默认提示词语言（首次使用时读取）/ Default prompt language from config (read on first use)
+_default_language: Optional[str] = None
+
+
+def _get_default_language() -> str:
+    """
+    获取配置中的默认提示词语言 / Get default prompt language from config
+    
+    Returns:
+        str: 语言代码 / Language code
+    """
+    global _default_language
+    if _default_language is None:
+        # 仅在需要默认语言时才加载配置 / Load config only when the default language is needed
+        from src.core.config import add_reload_listener, get_config
+        add_reload_listener(_on_config_reload)
+        _default_language = get_config().agent.prompt_language
+    return _default_language
+
+
+def _on_config_reload(config: Any) -> None:
+    """
+    配置重载时更新默认语言 / Update the default language on config reload
+    
+    Args:
+        config: 新的配置对象 / New config object
+    """
+    global _default_language
+    _default_language = config.agent.prompt_language
+
+
+class PromptMemoizer:
+    """
+    提示词备忘器 / Prompt Memoizer
+    
+    按语言划分子缓存，每个子缓存是以(提示词类型, 参数键)为key的LRU
+    Holds one sub-cache per language; each sub-cache is an LRU keyed by (prompt kind, argument key)
+    """
+    
+    def __init__(self, max_size: int = 32):
+        """
+        初始化备忘器 / Initialize memoizer
+        
+        Args:
+            max_size: 每种语言的最大缓存条数 / Maximum cached entries per language
+        """
+        self.max_size = max_size
+        self._per_lang: Dict[str, "OrderedDict[Tuple[str, Any], str]"] = {}
+    
+    def try_get(self, kind: str, lang: str, key: Any) -> Optional[str]:
+        """
+        查询缓存的提示词 / Look up a cached prompt
+        
+        Args:
+            kind: 提示词类型 / Prompt kind
+            lang: 语言 / Language
+            key: 参数键（须可哈希）/ Argument key (must be hashable)
+            
+        Returns:
+            Optional[str]: 缓存的提示词，未命中时为None / Cached prompt, None on miss
+        """
+        cache = self._per_lang.get(lang)
+        if cache is None:
+            return None
+        cache_key = (kind, key)
+        prompt = cache.get(cache_key)
+        if prompt is not None:
+            cache.move_to_end(cache_key)
+        return prompt
+    
+    def with_try_get(self, kind: str, lang: str, key: Any, builder: Callable[..., str], *args: Any) -> str:
+        """
+        获取提示词，未命中时调用 builder(*args) 构建并缓存 / Get a prompt, building and caching it with builder(*args) on miss
+        
+        Args:
+            kind: 提示词类型 / Prompt kind
+            lang: 语言 / Language
+            key: 参数键（须可哈希）/ Argument key (must be hashable)
+            builder: 构建函数 / Builder function
+            *args: 传给构建函数的参数 / Arguments passed to the builder
+            
+        Returns:
+            str: 提示词 / Prompt
+        """
+        prompt = self.try_get(kind, lang, key)
+        if prompt is not None:
+            return prompt
+        
+        prompt = builder(*args)
+        cache = self._per_lang.setdefault(lang, OrderedDict())
+        cache[(kind, key)] = prompt
+        if len(cache) > self.max_size:
+            cache.popitem(last=False)
+        return prompt
+    
+    def clear(self) -> None:
+        """清空所有语言的缓存 / Clear caches for all languages"""
+        self._per_lang.clear()
+
+
+# 全局提示词备忘器 / Global prompt memoizer
+_prompt_memoizer = PromptMemoizer()
+
+
+def _tools_fingerprint(tools: List) -> Tuple[Tuple[Any, ...], ...]:
+    """
+    计算工具集指纹 / Compute tool-set fingerprint
+    
+    Args:
+        tools: 工具列表 / List of tools
+        
+    Returns:
+        Tuple: 由工具类、名称和输入Schema组成的元组 / Tuple of tool class, name and input schema
+    """
+    return tuple((type(tool), tool.name, getattr(tool, "input_schema", None)) for tool in tools)
+
+
+def clear_prompt_cache() -> None:
+    """清空提示词缓存 / Clear prompt cache"""
+    _prompt_memoizer.clear()
 
 
 def get_system_prompt(
@@ -219,6 +409,10 @@ def get_system_prompt(
     """
     获取系统提示词 / Get system prompt
     
+    工具集和语言在进程内基本不变，结果按二者缓存，保证提示词前缀字节一致
+    Tool set and language rarely change within a process, so the result is cached
+    on both, keeping the prompt prefix byte-identical across calls
+    
     Args:
         tools: 可用工具列表 / List of available tools
         language: 语言选择（zh/en）/ Language selection (zh/en)
@@ -226,23 +420,121 @@ def get_system_prompt(
     Returns:
         str: 格式化的系统提示词 / Formatted system prompt
     """
-    config = get_config()
-    lang = language or config.agent.prompt_language
+    lang = language or _get_default_language()
+    return _prompt_memoizer.with_try_get(
+        "system", lang, _tools_fingerprint(tools), _build_system_prompt, tools, lang
+    )
+
+
+def _build_system_prompt(tools: List, lang: str) -> str:
+    """
+    构建系统提示词（不经缓存）/ Build system prompt (uncached)
     
+    Args:
+        tools: 可用工具列表 / List of available tools
+        lang: 语言 / Language
+        
+    Returns:
+        str: 格式化的系统提示词 / Formatted system prompt
+    """
     # 生成工具描述 / Generate tool descriptions
     tools_description = _generate_tools_description(tools, lang)
     
     # 选择提示词模板 / Select prompt template
-    if lang == "zh":
-        return SYSTEM_PROMPT_ZH.format(tools_description=tools_description)
+    segments = _SYSTEM_TEMPLATES.get(lang) or _SYSTEM_TEMPLATES["en"]
+    return _render_template(segments, {"tools_description": tools_description})
+
+
+def _english_part(text: str) -> str:
+    """
+    取出"中文 / English"双语文本中的英文部分 / Take the English part of a "中文 / English" bilingual text
+    
+    Args:
+        text: 原始文本 / Original text
+        
+    Returns:
+        str: 第一个纯ASCII的"/"后缀；找不到时返回原文本 / The first pure-ASCII suffix after "/"; the original text if there is none
+    """
+    if text.isascii():
+        return text
+    start = text.find("/")
+    while start != -1:
+        tail = text[start + 1:]
+        if tail.isascii():
+            return tail.strip()
+        start = text.find("/", start + 1)
+    return text
+
+
+def _format_parameters(properties: Dict[str, Any], language: str) -> str:
+    """
+    生成参数描述 / Format parameter description
+    
+    Args:
+        properties: JSON Schema中的properties / The properties of a JSON schema
+        language: 语言 / Language
+        
+    Returns:
+        str: 参数描述文本 / Parameter description text
+    """
+    if language == "zh":
+        if not properties:
+            return NO_PARAMETERS_ZH
+        return "".join(
+            f"\n  - `{name}` ({info.get('type', 'any')}): {info.get('description', '')}"
+            for name, info in properties.items()
+        )
+    
+    if not properties:
+        return NO_PARAMETERS_EN
+    return "".join(
+        f"\n  - `{name}` ({info.get('type', 'any')}): {_english_part(info.get('description', ''))}"
+        for name, info in properties.items()
+    )
+
+
+def render_tool_description(tool: Any, language: str) -> str:
+    """
+    渲染单个工具的描述片段 / Render the description fragment of a single tool
+    
+    Args:
+        tool: 工具实例 / Tool instance
+        language: 语言 / Language
+        
+    Returns:
+        str: "### 名称 / 描述 / 参数" 格式的Markdown片段 / Markdown fragment in "### name / description / parameters" layout
+    """
+    # 获取工具描述 / Get tool description
+    # BaseTool子类在类创建时已绑定 _desc_zh/_desc_en / BaseTool subclasses bind _desc_zh/_desc_en at class creation
+    if language == "zh":
+        desc = getattr(tool, "_desc_zh", None) or getattr(tool, "description_zh", tool.description)
+        desc_label, params_label = TOOL_DESCRIPTION_LABELS_ZH
+        params = NO_PARAMETERS_ZH
     else:
-        return SYSTEM_PROMPT_EN.format(tools_description=tools_description)
+        desc = getattr(tool, "_desc_en", None) or getattr(tool, "description_en", tool.description)
+        desc_label, params_label = TOOL_DESCRIPTION_LABELS_EN
+        params = NO_PARAMETERS_EN
+    
+    # 获取参数信息：BaseTool复用按类缓存的函数调用Schema，不再单独缓存
+    # Get parameter info: BaseTool reuses its per-class cached function-calling schema, no separate cache here
+    if getattr(tool, "input_schema", None):
+        get_schema = getattr(tool, "get_schema", None)
+        if get_schema is not None:
+            properties = get_schema()["function"]["parameters"]["properties"]
+        else:
+            properties = tool.input_schema.model_json_schema().get("properties", {})
+        params = _format_parameters(properties, language)
+    
+    return "".join(("### ", tool.name, desc_label, desc, params_label, params, "\n"))
 
 
 def _generate_tools_description(tools: List, language: str) -> str:
     """
     生成工具描述 / Generate tool descriptions
     
+    BaseTool在首次使用时缓存自身片段，此处只做拼接
+    BaseTool caches its own fragment on first use, so this is only a join
+    
     Args:
         tools: 工具列表 / List of tools
         language: 语言 / Language
@@ -250,34 +542,12 @@ def _generate_tools_description(tools: List, language: str) -> str:
     Returns:
         str: 工具描述文本 / Tool description text
     """
-    descriptions = []
+    attr = "rendered_description_zh" if language == "zh" else "rendered_description_en"
     
-    for tool in tools:
-        # 获取工具描述 / Get tool description
-        if language == "zh":
-            desc = getattr(tool, "description_zh", tool.description)
-            template = TOOL_DESCRIPTION_TEMPLATE_ZH
-        else:
-            desc = getattr(tool, "description_en", tool.description)
-            template = TOOL_DESCRIPTION_TEMPLATE_EN
-        
-        # 获取参数信息 / Get parameter info
-        params = "无 / None"
-        if hasattr(tool, "input_schema") and tool.input_schema:
-            schema = tool.input_schema.model_json_schema()
-            props = schema.get("properties", {})
-            if props:
-                param_list = []
-                for name, info in props.items():
-                    param_desc = info.get("description", "")
-                    param_type = info.get("type", "any")
-                    param_list.append(f"`{name}` ({param_type}): {param_desc}")
-                params = "\n  - ".join([""] + param_list)
-        
-        descriptions.append(template.format(
-            name=tool.name,
-            description=desc,
-            parameters=params
-        ))
+    # 预分配列表，避免生成器在 join 内部逐步扩容 / Pre-size the list so join does not grow it from a generator
+    descriptions: List[str] = [""] * len(tools)
+    for i, tool in enumerate(tools):
+        descriptions[i] = getattr(tool, attr, None) or render_tool_description(tool, language)
     
+    # 工具之间以空行分隔 / Tools are separated by a blank line
     return "\n".join(descriptions)
@@ -5,6 +5,7 @@
 # Defines various data structures used by the Agent
 # ==============================================================================
 
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -32,7 +33,7 @@ class ToolResultStatus(Enum):
     TIMEOUT = "timeout"  # 超时 / Timeout
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """
     工具调用记录 / Tool Call Record
@@ -42,9 +43,14 @@ class ToolCall:
     """
     tool_name: str  # 工具名称 / Tool name
     arguments: Dict[str, Any]  # 调用参数 / Call arguments
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.time_ns)  # 创建时间（纳秒）/ Creation time (nanoseconds)
     call_id: Optional[str] = None  # 调用ID / Call ID
     
+    @property
+    def timestamp(self) -> datetime:
+        """创建时间（按需转换）/ Creation time (converted on demand)"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典 / Convert to dictionary"""
         return {
@@ -55,7 +61,7 @@ class ToolCall:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResult:
     """
     工具执行结果 / Tool Execution Result
@@ -68,7 +74,12 @@ class ToolResult:
     output: Any  # 输出结果 / Output result
     error_message: Optional[str] = None  # 错误信息 / Error message
     execution_time: float = 0.0  # 执行时间（秒）/ Execution time (seconds)
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.time_ns)  # 创建时间（纳秒）/ Creation time (nanoseconds)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """创建时间（按需转换）/ Creation time (converted on demand)"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典 / Convert to dictionary"""
@@ -87,7 +98,7 @@ class ToolResult:
         return self.status == ToolResultStatus.SUCCESS
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentStep:
     """
     Agent执行步骤 / Agent Execution Step
@@ -97,24 +108,55 @@ class AgentStep:
     """
     step_number: int  # 步骤编号 / Step number
     thinking: str = ""  # 思考内容（Extended Thinking）/ Thinking content
-    tool_calls: List[ToolCall] = field(default_factory=list)  # 工具调用列表 / Tool calls
-    tool_results: List[ToolResult] = field(default_factory=list)  # 工具结果列表 / Tool results
+    # 工具调用/结果列表，首次添加时才分配（最终回答步骤通常没有）
+    # Tool call/result lists, allocated on first add (final-answer steps usually have none)
+    tool_calls: Optional[List[ToolCall]] = None  # 工具调用列表 / Tool calls
+    tool_results: Optional[List[ToolResult]] = None  # 工具结果列表 / Tool results
     response: Optional[str] = None  # 最终响应 / Final response
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.time_ns)  # 创建时间（纳秒）/ Creation time (nanoseconds)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """创建时间（按需转换）/ Creation time (converted on demand)"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+    
+    def add_tool_call(self, tool_call: ToolCall) -> None:
+        """
+        添加工具调用记录 / Add a tool call record
+        
+        Args:
+            tool_call: 工具调用记录 / Tool call record
+        """
+        if self.tool_calls is None:
+            self.tool_calls = [tool_call]
+        else:
+            self.tool_calls.append(tool_call)
+    
+    def add_tool_result(self, tool_result: ToolResult) -> None:
+        """
+        添加工具结果 / Add a tool result
+        
+        Args:
+            tool_result: 工具执行结果 / Tool execution result
+        """
+        if self.tool_results is None:
+            self.tool_results = [tool_result]
+        else:
+            self.tool_results.append(tool_result)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典 / Convert to dictionary"""
         return {
             "step_number": self.step_number,
             "thinking": self.thinking,
-            "tool_calls": [tc.to_dict() for tc in self.tool_calls],
-            "tool_results": [tr.to_dict() for tr in self.tool_results],
+            "tool_calls": [tc.to_dict() for tc in self.tool_calls] if self.tool_calls else [],
+            "tool_results": [tr.to_dict() for tr in self.tool_results] if self.tool_results else [],
             "response": self.response,
             "timestamp": self.timestamp.isoformat()
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentResponse:
     """
     Agent最终响应 / Agent Final Response
@@ -143,7 +185,7 @@ class AgentResponse:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class UserInput:
     """
     用户输入 / User Input
@@ -154,7 +196,12 @@ class UserInput:
     content: str  # 输入内容 / Input content
     context: Optional[Dict[str, Any]] = None  # 附加上下文 / Additional context
     attachments: List[str] = field(default_factory=list)  # 附件路径 / Attachment paths
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.time_ns)  # 创建时间（纳秒）/ Creation time (nanoseconds)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """创建时间（按需转换）/ Creation time (converted on demand)"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典 / Convert to dictionary"""
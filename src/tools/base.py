@@ -5,8 +5,11 @@
 # Defines base class and common interface for all tools
 # ==============================================================================
 
+import copy
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Type
+from functools import cached_property
+from typing import Any, ClassVar, Dict, Optional, Type
 
 from pydantic import BaseModel
 
@@ -16,6 +19,28 @@ from src.core.schema import ToolResult, ToolResultStatus
 logger = get_logger("tools.base")
 
 
+def decode_output(data: bytes) -> str:
+    """
+    解码子进程输出 / Decode subprocess output
+    
+    子进程以二进制方式捕获，只在输出非空时整体解码一次；换行与文本模式一致统一为 \\n
+    Subprocess output is captured as bytes and decoded once only when non-empty;
+    newlines are normalized to \\n as text mode would
+    
+    Args:
+        data: 原始输出字节 / Raw output bytes
+        
+    Returns:
+        str: 解码后的文本 / Decoded text
+    """
+    if not data:
+        return ""
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 class ToolInput(BaseModel):
     """
     工具输入基类 / Tool Input Base Class
@@ -49,9 +74,24 @@ class BaseTool(ABC):
     # 输入参数Schema / Input parameter schema
     input_schema: Optional[Type[ToolInput]] = None
     
-    def __init__(self):
-        """初始化工具 / Initialize tool"""
-        self.logger = get_logger(f"tools.{self.name}")
+    # 按类缓存的函数调用Schema，由 get_schema 首次调用时生成
+    # Per-class function-calling schema, built by the first get_schema call
+    _cached_schema: ClassVar[Optional[Dict[str, Any]]] = None
+    
+    # 类创建时绑定的提示词描述，渲染时无需逐个回退查找
+    # Prompt descriptions bound at class creation, so rendering needs no fallback lookup
+    _desc_zh: str = description_zh
+    _desc_en: str = description_en
+    
+    # 日志记录器按类共享 / Logger shared per class
+    logger = get_logger(f"tools.{name}")
+    
+    def __init_subclass__(cls, **kwargs):
+        """绑定子类的中英文描述和日志记录器 / Bind the subclass's Chinese and English descriptions and logger"""
+        super().__init_subclass__(**kwargs)
+        cls._desc_zh = cls.description_zh or cls.description
+        cls._desc_en = cls.description_en or cls.description
+        cls.logger = get_logger(f"tools.{cls.name}")
     
     @abstractmethod
     def _run(self, **kwargs) -> Any:
@@ -94,52 +134,40 @@ class BaseTool(ABC):
         Returns:
             ToolResult: 标准化的工具执行结果 / Standardized tool execution result
         """
-        import time
-        
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        output = None
+        error_msg = None
         
         try:
-            self.logger.info(f"执行工具 / Executing tool: {self.name}")
-            self.logger.debug(f"参数 / Parameters: {kwargs}")
+            # 日志参数交由loguru在记录实际输出时才格式化，级别不够时不会对kwargs做repr
+            # Log arguments are formatted by loguru only when the record is emitted, so kwargs is not repr'd below the level
+            self.logger.info("执行工具 / Executing tool: {}", self.name)
+            self.logger.debug("参数 / Parameters: {}", kwargs)
             
-            result = self._run(**kwargs)
+            output = self._run(**kwargs)
+            status = ToolResultStatus.SUCCESS
             
-            execution_time = time.time() - start_time
-            
-            self.logger.info(f"工具执行成功 / Tool executed successfully: {self.name}")
-            
-            return ToolResult(
-                tool_name=self.name,
-                status=ToolResultStatus.SUCCESS,
-                output=result,
-                execution_time=execution_time
-            )
+            self.logger.info("工具执行成功 / Tool executed successfully: {}", self.name)
             
         except TimeoutError as e:
-            execution_time = time.time() - start_time
+            status = ToolResultStatus.TIMEOUT
             error_msg = f"工具执行超时 / Tool execution timeout: {str(e)}"
             self.logger.error(error_msg)
             
-            return ToolResult(
-                tool_name=self.name,
-                status=ToolResultStatus.TIMEOUT,
-                output=None,
-                error_message=error_msg,
-                execution_time=execution_time
-            )
-            
         except Exception as e:
-            execution_time = time.time() - start_time
+            status = ToolResultStatus.ERROR
             error_msg = f"工具执行错误 / Tool execution error: {str(e)}"
             self.logger.error(error_msg)
-            
-            return ToolResult(
-                tool_name=self.name,
-                status=ToolResultStatus.ERROR,
-                output=None,
-                error_message=error_msg,
-                execution_time=execution_time
-            )
+        
+        # 各分支只记录状态，结果对象与耗时统一在此生成一次
+        # Branches only record the status; the result and elapsed time are produced once here
+        return ToolResult(
+            tool_name=self.name,
+            status=status,
+            output=output,
+            error_message=error_msg,
+            execution_time=(time.perf_counter_ns() - start_ns) / 1e9
+        )
     
     async def arun(self, **kwargs) -> ToolResult:
         """
@@ -151,52 +179,50 @@ class BaseTool(ABC):
         Returns:
             ToolResult: 标准化的工具执行结果 / Standardized tool execution result
         """
-        import time
-        
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        output = None
+        error_msg = None
         
         try:
-            self.logger.info(f"异步执行工具 / Executing tool asynchronously: {self.name}")
-            self.logger.debug(f"参数 / Parameters: {kwargs}")
-            
-            result = await self._arun(**kwargs)
-            
-            execution_time = time.time() - start_time
+            self.logger.info("异步执行工具 / Executing tool asynchronously: {}", self.name)
+            self.logger.debug("参数 / Parameters: {}", kwargs)
             
-            self.logger.info(f"工具执行成功 / Tool executed successfully: {self.name}")
+            output = await self._arun(**kwargs)
+            status = ToolResultStatus.SUCCESS
             
-            return ToolResult(
-                tool_name=self.name,
-                status=ToolResultStatus.SUCCESS,
-                output=result,
-                execution_time=execution_time
-            )
+            self.logger.info("工具执行成功 / Tool executed successfully: {}", self.name)
             
         except TimeoutError as e:
-            execution_time = time.time() - start_time
+            status = ToolResultStatus.TIMEOUT
             error_msg = f"工具执行超时 / Tool execution timeout: {str(e)}"
             self.logger.error(error_msg)
             
-            return ToolResult(
-                tool_name=self.name,
-                status=ToolResultStatus.TIMEOUT,
-                output=None,
-                error_message=error_msg,
-                execution_time=execution_time
-            )
-            
         except Exception as e:
-            execution_time = time.time() - start_time
+            status = ToolResultStatus.ERROR
             error_msg = f"工具执行错误 / Tool execution error: {str(e)}"
             self.logger.error(error_msg)
-            
-            return ToolResult(
-                tool_name=self.name,
-                status=ToolResultStatus.ERROR,
-                output=None,
-                error_message=error_msg,
-                execution_time=execution_time
-            )
+        
+        # 各分支只记录状态，结果对象与耗时统一在此生成一次
+        # Branches only record the status; the result and elapsed time are produced once here
+        return ToolResult(
+            tool_name=self.name,
+            status=status,
+            output=output,
+            error_message=error_msg,
+            execution_time=(time.perf_counter_ns() - start_ns) / 1e9
+        )
+    
+    @cached_property
+    def rendered_description_zh(self) -> str:
+        """中文系统提示词中的工具描述片段（首次访问时渲染）/ Chinese prompt fragment (rendered on first access)"""
+        from src.core.prompts import render_tool_description
+        return render_tool_description(self, "zh")
+    
+    @cached_property
+    def rendered_description_en(self) -> str:
+        """英文系统提示词中的工具描述片段（首次访问时渲染）/ English prompt fragment (rendered on first access)"""
+        from src.core.prompts import render_tool_description
+        return render_tool_description(self, "en")
     
     def get_schema(self) -> Dict[str, Any]:
         """
@@ -205,6 +231,34 @@ class BaseTool(ABC):
         用于LLM的函数调用（符合Kimi API要求）
         Used for LLM function calling (compliant with Kimi API requirements)
         
+        Schema只由类属性决定，每个类只生成一次并直接返回共享的缓存字典，调用方不得修改；
+        需要修改时请使用 get_schema_copy
+        The schema depends only on class attributes, is built once per class and the shared
+        cached dict is returned as-is, so callers must not mutate it; use get_schema_copy to edit
+        
+        Returns:
+            Dict: JSON Schema格式的工具定义（只读）/ Tool definition in JSON Schema format (read-only)
+        """
+        cls = type(self)
+        cached = cls.__dict__.get("_cached_schema")
+        if cached is None:
+            cached = self._build_schema()
+            cls._cached_schema = cached
+        return cached
+    
+    def get_schema_copy(self) -> Dict[str, Any]:
+        """
+        获取可修改的Schema深拷贝 / Get a mutable deep copy of the schema
+        
+        Returns:
+            Dict: JSON Schema格式的工具定义 / Tool definition in JSON Schema format
+        """
+        return copy.deepcopy(self.get_schema())
+    
+    def _build_schema(self) -> Dict[str, Any]:
+        """
+        生成工具的JSON Schema定义 / Build tool's JSON Schema definition
+        
         Returns:
             Dict: JSON Schema格式的工具定义 / Tool definition in JSON Schema format
         """
@@ -240,6 +294,15 @@ class BaseTool(ABC):
         
         return schema
     
+    def close(self) -> None:
+        """
+        释放工具持有的资源（默认无操作）/ Release resources held by the tool (no-op by default)
+        
+        持有子进程等外部资源的工具应覆盖此方法，Agent关闭时会调用
+        Tools holding external resources such as child processes should override this; called when the agent closes
+        """
+        pass
+    
     def __str__(self) -> str:
         return f"Tool(name={self.name})"
     
@@ -16,18 +16,299 @@
 # Use only in trusted environments or with proper sandboxing.
 # ==============================================================================
 
+import ast
+import atexit
+import collections
 import io
 import os
+import reprlib
+import select
 import sys
 import subprocess
 import tempfile
 import contextlib
-from typing import Any, Optional
+import weakref
+from functools import lru_cache
+from types import CodeType
+from typing import IO, Any, List, Optional, Tuple
 
 from pydantic import Field
 
 from src.core.config import get_config
-from src.tools.base import BaseTool, ToolInput
+from src.tools.base import BaseTool, ToolInput, decode_output
+
+
+# close_fds=True 会让 subprocess 放弃 posix_spawn 退回 fork+exec，而 fork 需要复制整个父进程的页表；
+# Python 创建的文件描述符默认不可继承（PEP 446），不关闭也不会泄漏到子进程
+# close_fds=True makes subprocess skip posix_spawn and fall back to fork+exec, which copies the whole
+# parent's page tables; descriptors Python creates are non-inheritable by default (PEP 446), so
+# leaving them open does not leak them into the child
+_CLOSE_FDS = False
+
+
+# REPL变量预览：内置容器和字符串按元素数和长度提前截断，不会先生成完整repr再切片
+# REPL variable previews: built-in containers and strings are truncated by item count and length
+# as they are built, instead of producing the full repr and then slicing it
+_safe_repr = reprlib.Repr()
+_safe_repr.maxstring = 100
+_safe_repr.maxlist = _safe_repr.maxdict = _safe_repr.maxtuple = 6
+_safe_repr.maxset = _safe_repr.maxfrozenset = _safe_repr.maxdeque = 6
+_SAFE_REPR_TYPES = (str, list, tuple, dict, set, frozenset, collections.deque)
+
+
+def _preview_repr(value: Any) -> str:
+    """
+    生成变量的简短预览 / Build a short preview of a variable
+    
+    仅内置容器和字符串走reprlib；其他对象（包括子类）保持 repr(value)[:100]，
+    因为reprlib对它们同样会先调用完整的repr
+    Only built-in containers and strings go through reprlib; other objects (subclasses
+    included) keep repr(value)[:100], since reprlib would call their full repr anyway
+    
+    Args:
+        value: 变量值 / Variable value
+        
+    Returns:
+        str: 最多100个字符的预览 / Preview of at most 100 characters
+    """
+    if type(value) in _SAFE_REPR_TYPES:
+        return _safe_repr.repr(value)[:100]
+    return repr(value)[:100]
+
+
+def _wait_process(proc: subprocess.Popen, timeout: Optional[float]) -> int:
+    """
+    阻塞等待子进程退出 / Block until a child process exits
+    
+    Popen.wait(timeout) 在POSIX上以递增的sleep反复waitpid轮询；支持pidfd的Linux上改为对pidfd做一次
+    阻塞poll，进程退出时立即唤醒，等待期间不占用CPU。未给超时时直接阻塞waitpid
+    Popen.wait(timeout) polls waitpid with growing sleeps on POSIX; on Linux with pidfd support this
+    does a single blocking poll on the pidfd instead, which wakes the moment the process exits and
+    burns no CPU while waiting. Without a timeout it is a plain blocking waitpid
+    
+    Args:
+        proc: 子进程 / Child process
+        timeout: 超时秒数，None表示不限 / Timeout in seconds, None for no limit
+        
+    Returns:
+        int: 返回码 / Return code
+        
+    Raises:
+        subprocess.TimeoutExpired: 超时未退出 / The process did not exit in time
+    """
+    if timeout is None:
+        return proc.wait()
+    
+    if hasattr(os, "pidfd_open") and hasattr(select, "poll"):
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except OSError:
+            # 内核不支持pidfd（Linux 5.3 之前）/ Kernel lacks pidfd (before Linux 5.3)
+            pidfd = None
+        
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                ready = poller.poll(timeout * 1000)
+            finally:
+                os.close(pidfd)
+            if not ready:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            return proc.wait()
+    
+    return proc.wait(timeout=timeout)
+
+
+def _read_capture(capture: IO[bytes]) -> bytes:
+    """
+    读回并关闭输出捕获文件 / Read back and close an output capture file
+    
+    Args:
+        capture: 子进程写入的临时文件 / Temporary file the child wrote to
+        
+    Returns:
+        bytes: 捕获的输出 / Captured output
+    """
+    try:
+        capture.seek(0)
+        return capture.read()
+    finally:
+        capture.close()
+
+
+@lru_cache(maxsize=256)
+def _compile_snippet(code: str) -> Tuple[CodeType, bool]:
+    """
+    编译REPL代码片段并缓存字节码 / Compile a REPL snippet and cache its bytecode
+    
+    只解析一次：整段为单个表达式语句时按eval编译并回显结果，否则整体按exec编译；
+    不再依赖SyntaxError做回退。重复提交的片段直接命中缓存，不再解析
+    Parses once: a snippet that is a single expression statement is compiled in eval mode
+    so its result is echoed, anything else is compiled as a whole in exec mode, with no
+    SyntaxError-driven fallback. Resubmitted snippets hit the cache and skip parsing entirely
+    
+    Args:
+        code: Python代码 / Python code
+        
+    Returns:
+        Tuple[CodeType, bool]: 代码对象，以及是否为表达式 / Code object, and whether it is an expression
+    """
+    tree = ast.parse(code, "<repl>", "exec")
+    if len(tree.body) == 1 and isinstance(tree.body[0], ast.Expr):
+        return compile(ast.Expression(tree.body[0].value), "<repl>", "eval"), True
+    return compile(tree, "<repl>", "exec"), False
+
+
+def _run_python_argv(args: List[str], timeout: Optional[float]) -> Tuple[bytes, bytes, int]:
+    """
+    启动解释器运行给定参数并等待结束 / Start an interpreter with the given arguments and wait for it
+    
+    输出写入临时文件而非管道，stdin接到空设备；超时或中断时终止并回收子进程
+    Output is written to temporary files instead of pipes and stdin is the null device;
+    the child is killed and reaped on timeout or interruption
+    
+    Args:
+        args: 解释器之后的命令行参数 / Command-line arguments after the interpreter
+        timeout: 超时时间 / Timeout
+        
+    Returns:
+        Tuple[bytes, bytes, int]: 标准输出、标准错误和返回码 / stdout, stderr and return code
+    """
+    with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(
+            [sys.executable, *args],
+            stdin=subprocess.DEVNULL,
+            stdout=stdout_file,
+            stderr=stderr_file,
+            close_fds=_CLOSE_FDS
+        )
+        try:
+            returncode = _wait_process(proc, timeout)
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        return _read_capture(stdout_file), _read_capture(stderr_file), returncode
+
+
+def _format_run_output(stdout: bytes, stderr: bytes, returncode: int, no_output_msg: str) -> str:
+    """
+    将子进程结果组装为工具输出 / Assemble a child process result into tool output
+    
+    Args:
+        stdout: 标准输出 / Standard output
+        stderr: 标准错误 / Standard error
+        returncode: 返回码 / Return code
+        no_output_msg: 无任何输出时返回的消息 / Message returned when there is no output at all
+        
+    Returns:
+        str: 执行结果 / Execution result
+    """
+    output_parts = []
+    
+    if stdout:
+        output_parts.append(f"输出 / Output:\n{decode_output(stdout)}")
+    
+    if stderr:
+        output_parts.append(f"错误 / Error:\n{decode_output(stderr)}")
+    
+    if returncode != 0:
+        output_parts.append(f"返回码 / Return code: {returncode}")
+    
+    if not output_parts:
+        return no_output_msg
+    
+    return "\n\n".join(output_parts)
+
+
+class _Interpreter:
+    """
+    从stdin读取代码的解释器进程 / Interpreter process that reads code from stdin
+    
+    输出直接写入临时文件而非管道：子进程按内核速度写出，父进程无需循环排空64KB的管道缓冲
+    Output goes straight to temporary files instead of pipes, so the child writes at kernel
+    speed and the parent never loops draining a 64KB pipe buffer
+    
+    工作目录和环境变量在启动时固定，任一变化后该进程不再复用。代码以 `python -` 从stdin读取，
+    因此与运行脚本文件不同：__file__ 为 "<stdin>" 而非真实路径（open(__file__) 或
+    os.path.dirname(__file__) 不再可用），sys.argv[0] 为 "-"，sys.path[0] 为 ""（当前目录）
+    The working directory and environment are fixed at spawn and the process is not reused once
+    either changes. Code is read by `python -` from stdin, so unlike running a script file
+    __file__ is "<stdin>" rather than a real path (open(__file__) or os.path.dirname(__file__)
+    no longer work), sys.argv[0] is "-" and sys.path[0] is "" (the current directory)
+    """
+    
+    __slots__ = ("proc", "stdout_file", "stderr_file", "cwd", "env")
+    
+    def __init__(self):
+        self.stdout_file = tempfile.TemporaryFile()
+        self.stderr_file = tempfile.TemporaryFile()
+        try:
+            self.proc = subprocess.Popen(
+                [sys.executable, "-"],
+                stdin=subprocess.PIPE,
+                stdout=self.stdout_file,
+                stderr=self.stderr_file,
+                close_fds=_CLOSE_FDS
+            )
+        except BaseException:
+            self.stdout_file.close()
+            self.stderr_file.close()
+            raise
+        # 工作目录和环境变量在启动时固定 / The working directory and environment are fixed at spawn
+        self.cwd = os.getcwd()
+        self.env = dict(os.environ)
+    
+    def is_reusable(self) -> bool:
+        """进程仍在等待输入，且当前目录和环境变量未变 / The process is still waiting for input and the cwd and environment are unchanged"""
+        return self.proc.poll() is None and self.cwd == os.getcwd() and self.env == os.environ
+    
+    def run(self, code: str, timeout: int) -> Tuple[bytes, bytes, int]:
+        """
+        经stdin执行代码并等待结束 / Execute code via stdin and wait for exit
+        
+        Args:
+            code: Python代码 / Python code
+            timeout: 超时时间 / Timeout
+            
+        Returns:
+            Tuple[bytes, bytes, int]: 标准输出、标准错误和返回码 / stdout, stderr and return code
+        """
+        # 解释器先读完整个stdin再执行，写入不会因子进程运行而阻塞
+        # The interpreter reads all of stdin before running it, so the write never blocks on execution
+        try:
+            self.proc.stdin.write(code.encode("utf-8"))
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            # 子进程已提前退出，返回码会说明原因 / The child exited early; its return code tells why
+            pass
+        
+        returncode = _wait_process(self.proc, timeout)
+        return _read_capture(self.stdout_file), _read_capture(self.stderr_file), returncode
+    
+    def discard(self) -> None:
+        """终止进程并关闭输出文件 / Kill the process and close its output files"""
+        self.proc.kill()
+        self.proc.wait()
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        self.stdout_file.close()
+        self.stderr_file.close()
+
+
+# 仍持有备用解释器的工具实例，进程退出时统一终止
+# Tool instances that may hold a standby interpreter, all closed at interpreter exit
+_live_tools: "weakref.WeakSet[PythonTool]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_tools() -> None:
+    """进程退出时终止所有备用解释器 / Kill every standby interpreter at exit"""
+    for tool in list(_live_tools):
+        tool.close()
 
 
 class PythonInput(ToolInput):
@@ -253,9 +534,15 @@ Executes Python code and returns results. Supports direct execution, save and ex
         config = get_config()
         self.default_timeout = timeout or config.tools.code_executor.timeout
         
-        # REPL模式的持久化环境 / Persistent environment for REPL mode
+        # REPL模式的持久化命名空间（与交互式解释器一样只用一个字典）
+        # Persistent namespace for REPL mode (a single dict, as in the interactive interpreter)
         self._globals = {}
-        self._locals = {}
+        
+        # 预热的备用解释器：已完成启动、等待从stdin读取代码，首次子进程执行后才开始预热
+        # Warm standby interpreter: already started up and waiting to read code from stdin;
+        # warming begins after the first subprocess execution
+        self._standby: Optional[_Interpreter] = None
+        _live_tools.add(self)
     
     def _run(
         self,
@@ -290,8 +577,8 @@ Executes Python code and returns results. Supports direct execution, save and ex
         
         # 如果指定了save_to，保存代码到文件 / If save_to specified, save code to file
         if save_to:
-            save_result = self._save_code(code, save_to)
-            if "错误" in save_result or "Error" in save_result:
+            saved, save_result = self._save_code(code, save_to)
+            if not saved:
                 return save_result
         
         # 执行代码 / Execute code
@@ -300,7 +587,7 @@ Executes Python code and returns results. Supports direct execution, save and ex
         else:
             return self._execute_subprocess(code, exec_timeout)
     
-    def _save_code(self, code: str, file_path: str) -> str:
+    def _save_code(self, code: str, file_path: str) -> Tuple[bool, str]:
         """
         保存代码到文件 / Save code to file
         
@@ -309,24 +596,72 @@ Executes Python code and returns results. Supports direct execution, save and ex
             file_path: 文件路径 / File path
             
         Returns:
-            str: 保存结果 / Save result
+            Tuple[bool, str]: 是否成功及保存结果 / Whether it succeeded, and the save result
         """
         try:
-            # 确保目录存在 / Ensure directory exists
-            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            # 确保目录存在；目录通常已存在，一次isdir即可，省去makedirs的stat+mkdir+stat
+            # Ensure directory exists; it usually does, so one isdir replaces makedirs' stat+mkdir+stat
+            # 绝对路径只需纯字符串的normpath，无需abspath的getcwd / Absolute paths only need the string-only normpath, not abspath's getcwd
+            if os.path.isabs(file_path):
+                parent_dir = os.path.dirname(os.path.normpath(file_path))
+            else:
+                parent_dir = os.path.dirname(os.path.abspath(file_path))
+            if not os.path.isdir(parent_dir):
+                os.makedirs(parent_dir, exist_ok=True)
             
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(code)
             
-            return f"代码已保存到 / Code saved to: {file_path}"
+            return True, f"代码已保存到 / Code saved to: {file_path}"
             
         except Exception as e:
-            return f"保存代码错误 / Error saving code: {str(e)}"
+            return False, f"保存代码错误 / Error saving code: {str(e)}"
+    
+    def _acquire_interpreter(self) -> _Interpreter:
+        """
+        取出预热的解释器，不可用时新建 / Take the warm interpreter, or start a new one if unusable
+        
+        备用解释器的工作目录和环境变量在启动时固定，二者变化后不再复用
+        The standby's working directory and environment are fixed at spawn, so it is not reused once either changes
+        
+        Returns:
+            _Interpreter: 解释器 / Interpreter
+        """
+        interpreter = self._standby
+        self._standby = None
+        if interpreter is not None:
+            if interpreter.is_reusable():
+                return interpreter
+            interpreter.discard()
+        return _Interpreter()
+    
+    def _prepare_standby(self) -> None:
+        """预热下一个备用解释器，其启动与后续的LLM调用并行 / Warm the next standby, its startup overlaps the next LLM call"""
+        try:
+            self._standby = _Interpreter()
+        except OSError as e:
+            self._standby = None
+            self.logger.warning(f"备用解释器启动失败 / Failed to start standby interpreter: {e}")
+    
+    def close(self) -> None:
+        """
+        终止备用解释器 / Kill the standby interpreter
+        
+        由Agent关闭时调用，未显式关闭的实例在进程退出时统一清理
+        Called when the agent shuts down; instances never closed explicitly are cleaned up at exit
+        """
+        if self._standby is not None:
+            self._standby.discard()
+            self._standby = None
     
     def _execute_subprocess(self, code: str, timeout: int) -> str:
         """
         在子进程中执行代码 / Execute code in subprocess
         
+        每段代码仍在全新的进程中运行，但进程提前启动，省去解释器启动耗时
+        Each snippet still runs in a fresh process, but that process was started
+        ahead of time so interpreter startup is off the critical path
+        
         Args:
             code: Python代码 / Python code
             timeout: 超时时间 / Timeout
@@ -334,48 +669,27 @@ Executes Python code and returns results. Supports direct execution, save and ex
         Returns:
             str: 执行结果 / Execution result
         """
-        # 创建临时文件 / Create temporary file
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False, encoding="utf-8") as f:
-            f.write(code)
-            temp_file = f.name
+        try:
+            interpreter = self._acquire_interpreter()
+        except Exception as e:
+            return f"代码执行错误 / Code execution error: {str(e)}"
         
         try:
-            # 执行代码 / Execute code
-            result = subprocess.run(
-                [sys.executable, temp_file],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                encoding="utf-8",
-                errors="replace"
-            )
-            
-            output_parts = []
-            
-            if result.stdout:
-                output_parts.append(f"输出 / Output:\n{result.stdout}")
-            
-            if result.stderr:
-                output_parts.append(f"错误 / Error:\n{result.stderr}")
-            
-            if result.returncode != 0:
-                output_parts.append(f"返回码 / Return code: {result.returncode}")
-            
-            if not output_parts:
-                return "代码执行完成，无输出 / Code executed, no output"
+            # 代码经stdin传给解释器，无需落盘临时文件 / Code is fed to the interpreter via stdin, no temporary file on disk
+            try:
+                stdout, stderr, returncode = interpreter.run(code, timeout)
+            except BaseException:
+                interpreter.discard()
+                raise
             
-            return "\n\n".join(output_parts)
+            return _format_run_output(stdout, stderr, returncode, "代码执行完成，无输出 / Code executed, no output")
             
         except subprocess.TimeoutExpired:
             return f"代码执行超时（{timeout}秒）/ Code execution timeout ({timeout} seconds)"
         except Exception as e:
             return f"代码执行错误 / Code execution error: {str(e)}"
         finally:
-            # 清理临时文件 / Clean up temporary file
-            try:
-                os.unlink(temp_file)
-            except OSError:
-                pass
+            self._prepare_standby()
     
     def _execute_file(self, file_path: str, timeout: int) -> str:
         """
@@ -388,34 +702,20 @@ Executes Python code and returns results. Supports direct execution, save and ex
         Returns:
             str: 执行结果 / Execution result
         """
-        if not os.path.exists(file_path):
-            return f"文件不存在 / File not found: {file_path}"
-        
         try:
-            result = subprocess.run(
-                [sys.executable, file_path],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                encoding="utf-8",
-                errors="replace"
-            )
-            
-            output_parts = []
+            stdout, stderr, returncode = _run_python_argv([file_path], timeout)
             
-            if result.stdout:
-                output_parts.append(f"输出 / Output:\n{result.stdout}")
+            # 不预先检查文件是否存在：由解释器打开文件，只在它以返回码2（无法打开脚本）失败时才确认，
+            # 成功路径少一次stat，也没有检查与执行之间文件被删除的竞态
+            # No existence preflight: the interpreter opens the file, and existence is only checked
+            # when it fails with return code 2 (cannot open script), so the success path saves a stat
+            # and there is no race between the check and the run
+            if returncode == 2 and not stdout and not os.path.exists(file_path):
+                return f"文件不存在 / File not found: {file_path}"
             
-            if result.stderr:
-                output_parts.append(f"错误 / Error:\n{result.stderr}")
-            
-            if result.returncode != 0:
-                output_parts.append(f"返回码 / Return code: {result.returncode}")
-            
-            if not output_parts:
-                return f"文件执行完成，无输出 / File executed, no output: {file_path}"
-            
-            return "\n\n".join(output_parts)
+            return _format_run_output(
+                stdout, stderr, returncode, f"文件执行完成，无输出 / File executed, no output: {file_path}"
+            )
             
         except subprocess.TimeoutExpired:
             return f"文件执行超时（{timeout}秒）/ File execution timeout ({timeout} seconds)"
@@ -440,16 +740,18 @@ Executes Python code and returns results. Supports direct execution, save and ex
         
         try:
             with contextlib.redirect_stdout(stdout_capture), contextlib.redirect_stderr(stderr_capture):
-                # 尝试作为表达式执行 / Try to execute as expression
-                try:
-                    # 注意：eval/exec执行任意代码是此工具的设计用途
-                    # Note: eval/exec for arbitrary code is the intended design
-                    result = eval(code, self._globals, self._locals)  # nosec: intentional design
+                code_obj, is_expr = _compile_snippet(code)
+                
+                # 注意：eval/exec执行任意代码是此工具的设计用途
+                # Note: eval/exec for arbitrary code is the intended design
+                if is_expr:
+                    # 作为表达式执行 / Execute as expression
+                    result = eval(code_obj, self._globals)  # nosec: intentional design
                     if result is not None:
                         print(repr(result))
-                except SyntaxError:
+                else:
                     # 作为语句执行 / Execute as statement
-                    exec(code, self._globals, self._locals)  # nosec: intentional design
+                    exec(code_obj, self._globals)  # nosec: intentional design
             
             output_parts = []
             
@@ -477,7 +779,6 @@ Executes Python code and returns results. Supports direct execution, save and ex
             str: 重置结果 / Reset result
         """
         self._globals = {}
-        self._locals = {}
         return "REPL环境已重置 / REPL environment reset"
     
     def get_repl_variables(self) -> str:
@@ -488,11 +789,11 @@ Executes Python code and returns results. Supports direct execution, save and ex
             str: 变量列表 / Variable list
         """
         variables = []
-        for name, value in self._locals.items():
+        for name, value in self._globals.items():
             if not name.startswith("_"):
                 try:
                     var_type = type(value).__name__
-                    var_repr = repr(value)[:100]
+                    var_repr = _preview_repr(value)
                     variables.append(f"  {name} ({var_type}): {var_repr}")
                 except Exception:
                     variables.append(f"  {name}: <无法显示 / cannot display>")
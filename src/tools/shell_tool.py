@@ -12,6 +12,7 @@
 # ==============================================================================
 
 import os
+import re
 import subprocess
 import platform
 from typing import Any, List, Optional
@@ -19,7 +20,7 @@ from typing import Any, List, Optional
 from pydantic import Field
 
 from src.core.config import get_config
-from src.tools.base import BaseTool, ToolInput
+from src.tools.base import BaseTool, ToolInput, decode_output
 
 
 class ShellInput(ToolInput):
@@ -196,6 +197,15 @@ Executes commands in system shell and returns results. Supports Windows and Unix
         "> /dev/sda",
     ]
     
+    # 黑名单合并为一个预编译正则，一次扫描完成检查
+    # Blacklist merged into one precompiled regex so the check is a single scan
+    _DANGEROUS_RE = re.compile("|".join(map(re.escape, DANGEROUS_COMMANDS)))
+    
+    def __init_subclass__(cls, **kwargs):
+        """按子类的黑名单重新编译正则 / Recompile the regex from the subclass's blacklist"""
+        super().__init_subclass__(**kwargs)
+        cls._DANGEROUS_RE = re.compile("|".join(map(re.escape, cls.DANGEROUS_COMMANDS)))
+    
     def __init__(
         self,
         policy: Optional[str] = None,
@@ -239,9 +249,9 @@ Executes commands in system shell and returns results. Supports Windows and Unix
             tuple[bool, str]: (是否允许, 原因) / (is allowed, reason)
         """
         # 检查危险命令 / Check dangerous commands
-        for dangerous in self.DANGEROUS_COMMANDS:
-            if dangerous in command:
-                return False, f"命令包含危险操作 / Command contains dangerous operation: {dangerous}"
+        match = self._DANGEROUS_RE.search(command)
+        if match:
+            return False, f"命令包含危险操作 / Command contains dangerous operation: {match.group(0)}"
         
         # 根据策略检查 / Check based on policy
         if self.policy == 'deny_all':
@@ -302,20 +312,17 @@ Executes commands in system shell and returns results. Supports Windows and Unix
                 command,
                 shell=self.shell,
                 capture_output=True,
-                text=True,
                 timeout=exec_timeout,
-                cwd=cwd,
-                encoding='utf-8',
-                errors='replace'
+                cwd=cwd
             )
             
             output_parts = []
             
             if result.stdout:
-                output_parts.append(f"标准输出 / Stdout:\n{result.stdout}")
+                output_parts.append(f"标准输出 / Stdout:\n{decode_output(result.stdout)}")
             
             if result.stderr:
-                output_parts.append(f"标准错误 / Stderr:\n{result.stderr}")
+                output_parts.append(f"标准错误 / Stderr:\n{decode_output(result.stderr)}")
             
             if result.returncode != 0:
                 output_parts.append(f"返回码 / Return code: {result.returncode}")
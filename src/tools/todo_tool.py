@@ -347,14 +347,17 @@ List tasks: {"operation": "list"}
         if not isinstance(tasks, list):
             tasks = [str(tasks)]
         
+        # 同一批任务共用一个时间戳 / Tasks added in one batch share a single timestamp
+        now = datetime.now().isoformat()
+        
         added_tasks = []
         for task_desc in tasks:
             task = {
                 "id": TodoTool._next_id,
                 "description": str(task_desc).strip(),
                 "status": TaskStatus.PENDING,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
+                "created_at": now,
+                "updated_at": now
             }
             TodoTool._tasks[TodoTool._next_id] = task
             added_tasks.append(f"[{TodoTool._next_id}] {task_desc}")
@@ -17,15 +17,167 @@
 
 import os
 import shutil
+import stat
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Literal, Optional
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
 
 from pydantic import Field
 
-from src.core.config import get_config
+from src.core.config import add_reload_listener, get_config
 from src.tools.base import BaseTool, ToolInput
 
+# 前缀树中标记"允许目录终点"的键 / Key marking the end of an allowed directory in the prefix trie
+_TRIE_END = None
+
+# 目录列表表头分隔线 / Directory listing header rule
+_LIST_SEPARATOR = "-" * 50
+
+# 小文件直写的大小上限（字符数）/ Size limit (characters) for the direct small-file write
+_DIRECT_WRITE_MAX_CHARS = 64 * 1024
+
+# 直写不做换行转换，只在换行符本就是 \n 的平台上启用
+# The direct write does no newline translation, so it is only used where the line separator is \n
+_DIRECT_WRITE_OK = os.linesep == "\n"
+
+
+def _scandir_sorted(path: str) -> List[os.DirEntry]:
+    """
+    按名称排序列出目录项 / List directory entries sorted by name
+    
+    Args:
+        path: 目录路径 / Directory path
+        
+    Returns:
+        List[os.DirEntry]: 排序后的目录项 / Sorted directory entries
+    """
+    with os.scandir(path) as it:
+        return sorted(it, key=lambda entry: entry.name)
+
+
+def _split_path(normalized_path: str) -> List[str]:
+    """
+    将规范化路径拆分为组成部分 / Split a normalized path into components
+    
+    末尾分隔符先去掉，使根目录（"/" 或 "c:\\"）与其子路径的拆分方式一致
+    The trailing separator is stripped first so a root ("/" or "c:\\") splits consistently with its children
+    
+    Args:
+        normalized_path: 经 _normalize_path 处理的路径 / Path produced by _normalize_path
+        
+    Returns:
+        List[str]: 路径组成部分 / Path components
+    """
+    return normalized_path.rstrip(os.sep).split(os.sep)
+
+
+def _build_path_trie(normalized_paths: Iterable[str]) -> Dict[Any, Any]:
+    """
+    按路径组成部分构建前缀树 / Build a component-wise prefix trie
+    
+    Args:
+        normalized_paths: 规范化的允许目录 / Normalized allowed directories
+        
+    Returns:
+        Dict: 嵌套字典形式的前缀树 / Prefix trie as nested dicts
+    """
+    trie: Dict[Any, Any] = {}
+    for path in normalized_paths:
+        node = trie
+        for part in _split_path(path):
+            node = node.setdefault(part, {})
+        node[_TRIE_END] = True
+    return trie
+
+
+def _trie_has_prefix(trie: Dict[Any, Any], normalized_path: str) -> bool:
+    """
+    判断路径是否位于前缀树中某个目录之下 / Check whether a path lies under any directory in the trie
+    
+    按组成部分逐级下降，遇到目录终点立即返回，与允许目录的数量无关
+    Descends component by component and returns at the first directory end,
+    independent of how many directories are allowed
+    
+    Args:
+        trie: 允许目录前缀树 / Allowed-directory trie
+        normalized_path: 规范化的待查路径 / Normalized path to check
+        
+    Returns:
+        bool: 是否位于某个允许目录之下（含目录本身）/ Whether it lies under (or is) an allowed directory
+    """
+    node = trie
+    for part in _split_path(normalized_path):
+        node = node.get(part)
+        if node is None:
+            return False
+        if _TRIE_END in node:
+            return True
+    return False
+
+
+def _write_small_utf8(path: str, content: str) -> int:
+    """
+    以单次系统调用写入小文本 / Write small text with a single system call
+    
+    绕过 io 层的 BufferedWriter/TextIOWrapper，整体编码一次后直接 os.write
+    Bypasses the io stack's BufferedWriter/TextIOWrapper: encodes once and calls os.write directly
+    
+    Args:
+        path: 文件路径 / File path
+        content: 文件内容 / File content
+        
+    Returns:
+        int: 写入的字节数 / Number of bytes written
+    """
+    data = content.encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return len(data)
+
+
+@lru_cache(maxsize=1)
+def _default_allowed_dirs() -> Tuple[str, ...]:
+    """
+    获取配置中的默认允许目录（每个进程只查询一次配置）/ Get the configured default allowed directories (config looked up once per process)
+    
+    返回元组，避免调用方意外修改共享的缓存值；配置重载时缓存会被清空
+    Returns a tuple so callers cannot mutate the shared cached value; the cache is cleared on config reload
+    
+    Returns:
+        Tuple[str, ...]: 默认允许目录 / Default allowed directories
+    """
+    return tuple(get_config().tools.file_tool.allowed_directories)
+
+
+def _on_config_reload(config) -> None:
+    """配置重载时丢弃缓存的默认目录 / Drop the cached default directories on config reload"""
+    _default_allowed_dirs.cache_clear()
+
+
+add_reload_listener(_on_config_reload)
+
+
+def _normalize_path(path: str) -> str:
+    """
+    规范化路径用于比较 / Normalize a path for comparison
+    
+    normpath统一分隔符，normcase在Windows上转为小写（大小写不敏感），在Unix上不变
+    normpath unifies separators; normcase lowercases on Windows (case-insensitive) and is a no-op on Unix
+    
+    Args:
+        path: 路径 / Path
+        
+    Returns:
+        str: 规范化的绝对路径 / Normalized absolute path
+    """
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
 
 class FileInput(ToolInput):
     """文件操作输入 / File Operation Input"""
@@ -252,6 +404,9 @@ Unified tool for file read, write, and directory listing. Supports auto-creating
     
     input_schema = FileInput
     
+    # 单次读取的最大文件大小 / Maximum file size for a single read
+    MAX_READ_BYTES = 64 * 1024 * 1024
+    
     def __init__(self, allowed_directories: Optional[List[str]] = None):
         """
         初始化 / Initialize
@@ -260,30 +415,35 @@ Unified tool for file read, write, and directory listing. Supports auto-creating
             allowed_directories: 允许访问的目录列表 / List of allowed directories
         """
         super().__init__()
-        config = get_config()
-        self.allowed_directories = allowed_directories or config.tools.file_tool.allowed_directories
+        self.allowed_directories = allowed_directories or _default_allowed_dirs()
+        
+        # 允许目录在初始化时规范化一次，路径检查时直接比较
+        # Allowed directories are normalized once at init so path checks compare directly
+        self._allowed_abs = tuple(
+            _normalize_path(allowed_dir) for allowed_dir in self.allowed_directories
+        )
+        self._allowed_trie = _build_path_trie(self._allowed_abs)
     
-    def _is_path_allowed(self, file_path: str) -> bool:
+    def _is_path_allowed(self, file_path: str, abs_path: Optional[str] = None) -> bool:
         """
         检查路径是否在允许范围内 / Check if path is within allowed range
         
         Args:
             file_path: 文件路径 / File path
+            abs_path: 调用方已计算好的规范化绝对路径，可省去一次abspath
+                      Normalized absolute path already computed by the caller, saves one abspath
             
         Returns:
             bool: 是否允许访问 / Whether access is allowed
         """
-        abs_path = os.path.normpath(os.path.abspath(file_path))
-        for allowed_dir in self.allowed_directories:
-            allowed_abs = os.path.normpath(os.path.abspath(allowed_dir))
-            # 使用normpath确保路径分隔符一致，支持Windows和Unix
-            # Use normpath to ensure consistent path separators for Windows and Unix
-            if abs_path.startswith(allowed_abs):
-                # 确保匹配的是完整的目录，不是前缀重叠
-                # Ensure the match is for complete directory, not prefix overlap
-                if len(abs_path) == len(allowed_abs) or abs_path[len(allowed_abs)] in (os.sep, os.altsep or ''):
-                    return True
-        return False
+        if abs_path is None:
+            normalized = _normalize_path(file_path)
+        else:
+            normalized = os.path.normcase(abs_path)
+        
+        # 按完整的路径组成部分匹配，避免 /workspace 误匹配 /workspace2
+        # Matching whole components, so /workspace never matches /workspace2
+        return _trie_has_prefix(self._allowed_trie, normalized)
     
     def _run(
         self,
@@ -338,17 +498,26 @@ Unified tool for file read, write, and directory listing. Supports auto-creating
         if not self._is_path_allowed(file_path):
             return f"不允许访问该路径 / Access to this path is not allowed: {file_path}"
         
-        if not os.path.exists(file_path):
+        # 一次stat同时得到存在性、类型和大小 / One stat gives existence, type and size
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
             return f"文件不存在 / File not found: {file_path}"
         
-        if os.path.isdir(file_path):
+        if stat.S_ISDIR(file_stat.st_mode):
             return f"路径是目录，请使用list操作 / Path is a directory, use list operation: {file_path}"
         
+        file_size = file_stat.st_size
+        if file_size > self.MAX_READ_BYTES:
+            return (
+                f"文件过大 / File too large: {file_path} ({file_size} bytes > {self.MAX_READ_BYTES} bytes)"
+            )
+        
         try:
+            # 不带参数的read()按文件大小一次读入并整体解码 / A bare read() sizes the buffer from the file and decodes once
             with open(file_path, "r", encoding=encoding) as f:
                 content = f.read()
             
-            file_size = os.path.getsize(file_path)
             return f"文件内容 / File content ({file_size} bytes):\n\n{content}"
         except UnicodeDecodeError as e:
             return f"文件编码错误 / File encoding error: {str(e)}. 尝试使用其他编码 / Try another encoding"
@@ -378,15 +547,19 @@ Unified tool for file read, write, and directory listing. Supports auto-creating
         Returns:
             str: 操作结果 / Operation result
         """
+        # 绝对路径只计算一次，权限检查和目录创建共用
+        # The absolute path is computed once and shared by the permission check and directory creation
+        abs_path = os.path.normpath(os.path.abspath(file_path))
+        
         # 检查路径安全性 / Check path security
-        if not self._is_path_allowed(file_path):
+        if not self._is_path_allowed(file_path, abs_path):
             return f"不允许访问该路径 / Access to this path is not allowed: {file_path}"
         
         if content is None:
             return "写入内容不能为空 / Content cannot be empty for write operation"
         
+        backup_path = None
         try:
-            abs_path = os.path.abspath(file_path)
             parent_dir = os.path.dirname(abs_path)
             
             # 创建父目录 / Create parent directories
@@ -401,19 +574,29 @@ Unified tool for file read, write, and directory listing. Supports auto-creating
                 self.logger.info(f"已备份到 / Backed up to: {backup_path}")
             
             # 写入文件 / Write file
-            mode = "a" if append else "w"
-            with open(abs_path, mode, encoding=encoding) as f:
-                f.write(content)
-            
-            # 获取文件信息 / Get file info
-            file_size = os.path.getsize(abs_path)
+            if (
+                not append
+                and _DIRECT_WRITE_OK
+                and encoding == "utf-8"
+                and len(content) <= _DIRECT_WRITE_MAX_CHARS
+            ):
+                # 覆盖写入的字节数即文件大小，无需再stat
+                # For an overwrite the bytes written are the file size, no stat needed
+                file_size = _write_small_utf8(abs_path, content)
+            else:
+                mode = "a" if append else "w"
+                with open(abs_path, mode, encoding=encoding) as f:
+                    f.write(content)
+                
+                # 获取文件信息 / Get file info
+                file_size = os.path.getsize(abs_path)
             mode_text = "追加 / appended" if append else "写入 / written"
             
             result = f"文件{mode_text}成功 / File {mode_text} successfully: {file_path}\n"
             result += f"文件大小 / File size: {file_size} bytes\n"
             result += f"内容长度 / Content length: {len(content)} characters"
             
-            if backup and os.path.exists(f"{abs_path}.bak.{datetime.now().strftime('%Y%m%d%H%M%S')}"):
+            if backup_path:
                 result += f"\n备份文件 / Backup file: {backup_path}"
             
             return result
@@ -448,41 +631,52 @@ Unified tool for file read, write, and directory listing. Supports auto-creating
             items = []
             
             if recursive:
-                for root, dirs, files in os.walk(directory_path):
-                    rel_root = os.path.relpath(root, directory_path)
-                    if rel_root == ".":
-                        rel_root = ""
+                # 显式栈深度优先遍历，子目录按名称顺序进入（os.walk按文件系统顺序），不进入符号链接目录
+                # Explicit-stack depth-first walk; subdirectories are entered in name order (os.walk uses
+                # filesystem order), directory symlinks are not followed
+                stack = [(directory_path, "")]
+                while stack:
+                    current, prefix = stack.pop()
+                    try:
+                        entries = _scandir_sorted(current)
+                    except OSError:
+                        continue
                     
-                    for d in sorted(dirs):
-                        path = os.path.join(rel_root, d) if rel_root else d
-                        items.append(f"[DIR]  {path}/")
+                    # 先按类型分组，目录行整批加入 / Partition by type first, directory lines are added in one batch
+                    dirs = []
+                    files = []
+                    for entry in entries:
+                        (dirs if entry.is_dir() else files).append(entry)
+                    items.extend([f"[DIR]  {prefix}{entry.name}/" for entry in dirs])
                     
-                    for f in sorted(files):
-                        path = os.path.join(rel_root, f) if rel_root else f
-                        file_path = os.path.join(root, f)
+                    for entry in files:
                         try:
-                            size = os.path.getsize(file_path)
-                            items.append(f"[FILE] {path} ({size} bytes)")
+                            items.append(f"[FILE] {prefix}{entry.name} ({entry.stat().st_size} bytes)")
                         except OSError:
-                            items.append(f"[FILE] {path}")
+                            items.append(f"[FILE] {prefix}{entry.name}")
+                    
+                    for entry in reversed(dirs):
+                        if not entry.is_symlink():
+                            stack.append((entry.path, f"{prefix}{entry.name}{os.sep}"))
             else:
-                for item in sorted(os.listdir(directory_path)):
-                    item_path = os.path.join(directory_path, item)
-                    if os.path.isdir(item_path):
-                        items.append(f"[DIR]  {item}/")
+                # scandir的目录项自带类型信息，无需逐项isdir / scandir entries carry their type, no per-entry isdir
+                for entry in _scandir_sorted(directory_path):
+                    if entry.is_dir():
+                        items.append(f"[DIR]  {entry.name}/")
                     else:
                         try:
-                            size = os.path.getsize(item_path)
-                            items.append(f"[FILE] {item} ({size} bytes)")
+                            items.append(f"[FILE] {entry.name} ({entry.stat().st_size} bytes)")
                         except OSError:
-                            items.append(f"[FILE] {item}")
+                            items.append(f"[FILE] {entry.name}")
             
             if not items:
                 return f"目录为空 / Directory is empty: {directory_path}"
             
-            header = f"目录内容 / Directory content: {directory_path}\n"
-            header += f"共 {len(items)} 项 / Total {len(items)} items\n"
-            header += "-" * 50 + "\n"
+            header = (
+                f"目录内容 / Directory content: {directory_path}\n"
+                f"共 {len(items)} 项 / Total {len(items)} items\n"
+                f"{_LIST_SEPARATOR}\n"
+            )
             
             return header + "\n".join(items)
             
@@ -0,0 +1,40 @@
+# ==============================================================================
+# 提示词测试 / Prompt Tests
+# ==============================================================================
+# 运行 / Run: python -m unittest
+# ==============================================================================
+
+import unittest
+
+from src.core.prompts import (
+    NO_PARAMETERS_EN,
+    SYSTEM_PROMPT_EN,
+    TOOL_DESCRIPTION_LABELS_EN,
+    clear_prompt_cache,
+    get_system_prompt,
+)
+from src.tools import ALL_TOOLS
+
+
+class EnglishPromptAsciiTest(unittest.TestCase):
+    """英文提示词保持纯ASCII / English prompt stays pure ASCII"""
+
+    def test_templates_are_ascii(self):
+        self.assertTrue(SYSTEM_PROMPT_EN.isascii())
+        self.assertTrue(all(label.isascii() for label in TOOL_DESCRIPTION_LABELS_EN))
+        self.assertTrue(NO_PARAMETERS_EN.isascii())
+
+    def test_rendered_prompt_is_ascii(self):
+        tools = [tool_class() for tool_class in ALL_TOOLS]
+        try:
+            clear_prompt_cache()
+            prompt = get_system_prompt(tools, "en")
+        finally:
+            for tool in tools:
+                tool.close()
+        non_ascii = [line for line in prompt.splitlines() if not line.isascii()]
+        self.assertEqual(non_ascii, [])
+
+
+if __name__ == "__main__":
+    unittest.main()